@@ -2,44 +2,88 @@
 import markdown
 import sys
 import os
+import re
+import time
+import hashlib
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
 
 
-def convert_markdown_to_html(input_file, output_file=None, output_language="en"):
+# Converter of this process, reused for all documents
+_converter = None
+
+
+def get_converter():
+    """Returns the markdown converter of this process, reset for the next document."""
+    global _converter
+    if _converter is None:
+        _converter = markdown.Markdown(extensions=[
+            'extra',           # Additional markdown features
+            'codehilite',      # Syntax Highlighting
+            'toc',             # Table of contents
+            'tables',          # Table support
+            'attr_list'        # Attributes for html elements
+        ])
+    return _converter.reset()
+
+
+def source_hash(markdown_content, output_language):
+    """Hash of everything an output depends on: the markdown source, the language and this script."""
+    digest = hashlib.sha256(markdown_content.encode('utf-8'))
+    digest.update(output_language.encode('utf-8'))
+    digest.update(Path(__file__).read_bytes())
+    return digest.hexdigest()
+
+
+def build_document(input_file, output_file=None, output_language="en", force=False):
     """
-    Converts markdown file into HTML
+    Converts a markdown file into HTML unless the output is up to date.
+
+    The output is skipped if the source hash stored in it still matches. The hash covers the
+    language as well, so a timestamp alone cannot tell whether the output is up to date.
 
     Args:
         input_file (str): Path to markdown file
         output_file (str): Path to html output file (optional)
         output_language (str): Language code for HTML output (optional)
-    """
+        force (bool): Convert even if the output is up to date
 
-    # Check input file
-    if not os.path.exists(input_file):
-        print(f"Error: File '{input_file}' not found.")
-        return False
+    Returns:
+        tuple: (input file, output file, status, seconds, error), status is 'converted',
+            'unchanged', 'up to date' or 'failed'
+    """
+    start_time = time.perf_counter()
 
     # Set output file
     if output_file is None:
-        input_path = Path(input_file)
-        output_file = input_path.with_suffix('.html')
+        output_file = str(Path(input_file).with_suffix('.html'))
+
+    def result(status, error=None):
+        return input_file, output_file, status, time.perf_counter() - start_time, error
+
+    # Check input file
+    if not os.path.exists(input_file):
+        return result('failed', f"File '{input_file}' not found.")
 
     try:
+        output_path = Path(output_file)
+
         # Read markdown file
         with open(input_file, 'r', encoding='utf-8') as f:
             markdown_content = f.read()
 
-        # Setup converter
-        md = markdown.Markdown(extensions=[
-            'extra',           # Additional markdown features
-            'codehilite',      # Syntax Highlighting
-            'toc',             # Table of contents
-            'tables',          # Table support
-            'attr_list'        # Attributes for html elements
-        ])
+        content_hash = source_hash(markdown_content, output_language)
+        if not force and output_path.exists():
+            with open(output_file, 'r', encoding='utf-8') as f:
+                stored_hash = re.search(r'<meta name="source-hash" content="(\w+)">', f.read(4096))
+            if stored_hash and stored_hash.group(1) == content_hash:
+                if output_path.stat().st_mtime >= os.path.getmtime(input_file):
+                    return result('up to date')
+                # Only the timestamp of the source changed, e.g. after a checkout
+                output_path.touch()
+                return result('unchanged')
 
-        html_content = md.convert(markdown_content)
+        html_content = get_converter().convert(markdown_content)
 
         # HTML template
         html_template = f"""<!DOCTYPE html>
@@ -47,6 +91,7 @@ def convert_markdown_to_html(input_file, output_file=None, output_language="en")
 <head>
     <meta charset="UTF-8">
     <meta name="viewport" content="width=device-width, initial-scale=1.0">
+    <meta name="source-hash" content="{content_hash}">
     <title>Sivvy</title>
     <link rel="stylesheet" type="text/css" media="all" href="style.css">
 </head>
@@ -61,26 +106,110 @@ def convert_markdown_to_html(input_file, output_file=None, output_language="en")
         with open(output_file, 'w', encoding='utf-8') as f:
             f.write(html_template)
 
-        print(f"Converted successfully: {input_file} → {output_file}")
-        return True
+        return result('converted')
 
     except Exception as e:
-        print(f"Error converting: {e}")
+        return result('failed', e)
+
+
+def convert_markdown_to_html(input_file, output_file=None, output_language="en", force=False):
+    """
+    Converts markdown file into HTML
+
+    Args:
+        input_file (str): Path to markdown file
+        output_file (str): Path to html output file (optional)
+        output_language (str): Language code for HTML output (optional)
+        force (bool): Convert even if the output is up to date (optional)
+    """
+    input_file, output_file, status, seconds, error = build_document(input_file, output_file, output_language, force)
+
+    if status == 'failed':
+        print(f"Error converting: {error}")
         return False
 
+    if status == 'converted':
+        print(f"Converted successfully: {input_file} → {output_file}")
+    else:
+        print(f"Output is {status}: {output_file}")
+    return True
+
+
+def build_documents(jobs, force=False, max_workers=None):
+    """
+    Converts many markdown files, independent files in parallel processes.
+
+    Args:
+        jobs (list): (input file, output file, language code) tuples, output file may be None
+        force (bool): Convert even if the outputs are up to date
+        max_workers (int): Number of processes, default is the number of CPUs
+
+    Returns:
+        bool: True if all files were converted or up to date
+    """
+    start_time = time.perf_counter()
+    max_workers = min(len(jobs), max_workers or os.cpu_count() or 1)
+
+    if max_workers > 1:
+        with ProcessPoolExecutor(max_workers=max_workers) as executor:
+            futures = [executor.submit(build_document, input_file, output_file, output_language, force)
+                       for input_file, output_file, output_language in jobs]
+            results = [future.result() for future in futures]
+    else:
+        results = [build_document(input_file, output_file, output_language, force)
+                   for input_file, output_file, output_language in jobs]
+
+    for input_file, output_file, status, seconds, error in results:
+        print(f"{status:>10}  {seconds:6.2f}s  {input_file} → {output_file}")
+        if error is not None:
+            print(f"            Error: {error}")
+
+    statuses = [status for _, _, status, _, _ in results]
+    print(f"{statuses.count('converted')} converted, {statuses.count('unchanged') + statuses.count('up to date')} up to date, "
+          f"{statuses.count('failed')} failed in {time.perf_counter() - start_time:.2f} seconds")
+    return 'failed' not in statuses
+
+
+def parse_job(spec):
+    """
+    Parses a batch job given as input.md[:output.html[:lang]].
+
+    A single letter followed by a colon and a path separator is a Windows drive, e.g. C:\\docs\\README.md.
+    """
+    fields = []
+    for part in spec.split(':'):
+        if fields and len(fields[-1]) == 1 and fields[-1].isalpha() and part[:1] in ('\\', '/'):
+            fields[-1] += ':' + part
+        else:
+            fields.append(part)
+    input_file, output_file, output_language = (fields + [None, None])[:3]
+    return input_file, output_file or None, output_language or "en"
+
 
 def main():
     """Main function"""
-    if len(sys.argv) < 3:
-        print("Usage: python docbuilder.py <input.md> [output.html] [lang=code]")
-        print("Example: python docbuilder.py README.md")
+    arguments = sys.argv[1:]
+    force = '--force' in arguments
+    arguments = [argument for argument in arguments if argument != '--force']
+
+    if arguments and arguments[0] == '--batch':
+        if len(arguments) < 2:
+            print("Usage: python docbuilder.py --batch [--force] <input.md>[:<output.html>[:<lang>]] ...")
+            return
+        success = build_documents([parse_job(spec) for spec in arguments[1:]], force)
+        sys.exit(0 if success else 1)
+
+    if len(arguments) < 2:
+        print("Usage: python docbuilder.py [--force] <input.md> [output.html] [lang=code]")
+        print("       python docbuilder.py --batch [--force] <input.md>[:<output.html>[:<lang>]] ...")
+        print("Example: python docbuilder.py --batch README.md:doc/README-en.html:en README-de.md:doc/README-de.html:de")
         return
 
-    input_file = sys.argv[1]
-    output_file = sys.argv[2] if len(sys.argv) > 2 else None
-    output_language = sys.argv[3] if len(sys.argv) > 3 else "en"
+    input_file = arguments[0]
+    output_file = arguments[1] if len(arguments) > 1 else None
+    output_language = arguments[2] if len(arguments) > 2 else "en"
 
-    convert_markdown_to_html(input_file, output_file, output_language)
+    convert_markdown_to_html(input_file, output_file, output_language, force)
 
 
 if __name__ == "__main__":
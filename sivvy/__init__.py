@@ -0,0 +1,4 @@
+"""Sivvy - a CSV editor for your terminal."""
+from .sivvy import Table
+
+__all__ = ['Table']
@@ -10,8 +10,30 @@ import re
 import argparse
 import signal
 import time
+import sqlite3
+import difflib
+import bisect
+import io
+import codecs
+import gzip
+import bz2
+import lzma
+import queue
+import threading
+import hashlib
+import heapq
+import tempfile
+import json
+import math
+import random
+from array import array
+from operator import itemgetter
+from datetime import date, datetime
+from itertools import zip_longest, chain, islice, compress
+from contextlib import ExitStack
+from concurrent.futures import ProcessPoolExecutor
+from collections import Counter
 from pathlib import Path
-from io import StringIO
 from tabulate import tabulate
 
 
@@ -21,154 +43,946 @@ if sys.version_info < (3, 10):
     sys.exit(1)
 
 
-class Sivvy:
-    # List of supported table output formats
-    SUPPORTED_TABLE_FORMATS = [
-        "plain", "simple", "github", "grid", "simple_grid", "rounded_grid", 
-        "heavy_grid", "mixed_grid", "double_grid", "fancy_grid", "outline", "simple_outline", 
-        "rounded_outline", "heavy_outline", "mixed_outline", "double_outline", "fancy_outline", 
-        "pipe", "orgtbl", "asciidoc", "jira", "presto", "pretty", 
-        "psql", "rst", "mediawiki", "moinmoin", "youtrack", "html", 
-        "unsafehtml", "latex", "latex_raw", "latex_booktabs", "latex_longtable", 
-        "textile", "tsv"
-    ]
+class ReadAheadReader(io.RawIOBase):
+    """
+    Binary stream that reads ahead from another stream in a background thread.
+
+    Used for compressed files, so decompression of the next chunks overlaps with parsing.
+    """
+    chunk_size = 1024 * 1024
+
+    def __init__(self, stream, source=None, max_chunks=8):
+        super().__init__()
+        self.stream = stream
+        self.source = source  # Underlying compressed file, used for progress and closed with the reader
+        self.chunks = queue.Queue(max_chunks)
+        self.pending = memoryview(b'')
+        self.finished = False
+        self.error = None
+        self.stopped = threading.Event()
+        self.thread = threading.Thread(target=self._read_chunks, daemon=True)
+        self.thread.start()
+
+    def _read_chunks(self):
+        """Reads chunks until the end of the stream, an empty chunk marks the end."""
+        try:
+            while not self.stopped.is_set():
+                chunk = self.stream.read(self.chunk_size)
+                self._put_chunk(chunk)
+                if not chunk:
+                    return
+        except Exception as e:
+            self.error = e
+            self._put_chunk(b'')
 
-    supported_delimiter_keywords = {
-        'TAB': '\t',
-        'SPACE': ' ',
-        'SEMICOLON': ';',
-        'PIPE': '|',
-        'COMMA': ','
-    }
+    def _put_chunk(self, chunk):
+        """Queues a chunk, giving up if the reader is closed meanwhile."""
+        while not self.stopped.is_set():
+            try:
+                self.chunks.put(chunk, timeout=0.1)
+                return
+            except queue.Full:
+                continue
 
-    def __init__(self, filename, display_range=None, table_format="simple", column_delimiter=",", manual_delimiter_set=False, output_filename=None):
-        # Determine current script directory
-        if getattr(sys, 'frozen', False):
-            self.scriptdir = Path(sys.executable).parent
+    def readable(self):
+        return True
+
+    def readinto(self, buffer):
+        if not self.pending:
+            if self.finished:
+                return 0
+            chunk = self.chunks.get()
+            if not chunk:
+                self.finished = True
+                if self.error is not None:
+                    raise self.error
+                return 0
+            self.pending = memoryview(chunk)
+
+        size = min(len(buffer), len(self.pending))
+        buffer[:size] = self.pending[:size]
+        self.pending = self.pending[size:]
+        return size
+
+    def close(self):
+        if not self.closed:
+            self.stopped.set()
+            self.thread.join()
+            self.stream.close()
+            if self.source is not None:
+                self.source.close()
+        super().close()
+
+
+class SchemaValidator:
+    """
+    Checks table rows against the column constraints of a schema file.
+
+    Rows are checked when they are added and forgotten when they are removed. Values of
+    unique columns are counted in hash maps, so edits never need another full scan.
+    """
+    rule_keys = {'required', 'unique', 'type', 'format', 'pattern'}
+    value_types = {'text', 'int', 'float', 'date'}
+
+    def __init__(self, columns, headers, translate):
+        """
+        Args:
+            columns (dict): Zero-based column index -> constraints from the schema file
+            headers (list): Column headers of the table
+            translate (callable): Translation function for messages
+
+        Raises:
+            ValueError: If a constraint is unknown or invalid
+            re.error: If a pattern is not a valid regular expression
+        """
+        self._ = translate
+        self.rules = {}
+        for column, rule in columns.items():
+            if not isinstance(rule, dict):
+                raise ValueError(f"Constraints of column '{headers[column]}' must be an object")
+            unknown_keys = set(rule) - self.rule_keys
+            if unknown_keys:
+                raise ValueError(f"Unknown constraint '{sorted(unknown_keys)[0]}' for column '{headers[column]}'")
+            if rule.get('type', 'text') not in self.value_types:
+                raise ValueError(f"Unknown type '{rule['type']}' for column '{headers[column]}'")
+            self.rules[column] = {
+                'required': bool(rule.get('required')),
+                'unique': bool(rule.get('unique')),
+                'type': rule.get('type', 'text'),
+                'format': rule.get('format', '%Y-%m-%d'),
+                'pattern': re.compile(rule['pattern']) if rule.get('pattern') else None,
+            }
+        self.reset(len(headers))
+
+    def reset(self, width):
+        """Forgets all rows, e.g. before the table is checked again with a different number of columns."""
+        self.width = width
+        self.value_counts = {column: Counter() for column, rule in self.rules.items() if rule['unique']}
+        self.duplicate_count = 0  # Occurrences of unique values beyond the first
+        self.problems = {}  # id(row) -> (row, [(column, message)]) for rows that break a constraint
+
+    def check_row(self, row):
+        """
+        Checks a row against the constraints that do not depend on other rows.
+
+        Returns:
+            list: (column, message) tuples, column is None for problems of the whole row
+        """
+        problems = []
+        if len(row) != self.width:
+            problems.append((None, self._("%(found)s cells instead of %(expected)s") % {'found': len(row), 'expected': self.width}))
+
+        for column, rule in self.rules.items():
+            value = row[column].strip() if column < len(row) else ''
+            if not value:
+                if rule['required']:
+                    problems.append((column, self._("Value is required")))
+                continue
+
+            value_type = rule['type']
+            try:
+                if value_type == 'int':
+                    int(value)
+                elif value_type == 'float':
+                    float(value)
+                elif value_type == 'date':
+                    datetime.strptime(value, rule['format'])
+            except ValueError:
+                if value_type == 'date':
+                    problems.append((column, self._("'%(value)s' is not a date in format %(format)s") % {'value': value, 'format': rule['format']}))
+                else:
+                    problems.append((column, self._("'%(value)s' is not a valid %(type)s value") % {'value': value, 'type': value_type}))
+
+            if rule['pattern'] is not None and not rule['pattern'].fullmatch(value):
+                problems.append((column, self._("'%(value)s' does not match %(pattern)s") % {'value': value, 'pattern': rule['pattern'].pattern}))
+        return problems
+
+    def add_row(self, row, values=None):
+        """
+        Checks a row that was added to the table.
+
+        Args:
+            row (list): Row as stored in the table, identifies the row
+            values (list): Values of the row in the order of the headers, the row itself if None
+        """
+        if values is None:
+            values = row
+        for column, counts in self.value_counts.items():
+            value = values[column].strip() if column < len(values) else ''
+            if value:
+                if counts[value]:
+                    self.duplicate_count += 1
+                counts[value] += 1
+
+        problems = self.check_row(values)
+        if problems:
+            self.problems[id(row)] = (row, problems)
+
+    def remove_row(self, row, values=None):
+        """Forgets a row that is removed from the table, before it is removed or changed."""
+        if values is None:
+            values = row
+        for column, counts in self.value_counts.items():
+            value = values[column].strip() if column < len(values) else ''
+            if value:
+                counts[value] -= 1
+                if counts[value]:
+                    self.duplicate_count -= 1
+                else:
+                    del counts[value]
+
+        self.problems.pop(id(row), None)
+
+    def row_problems(self, row, values=None):
+        """Returns all problems of a row of the table, including values that are not unique."""
+        if values is None:
+            values = row
+        problems = list(self.problems[id(row)][1]) if id(row) in self.problems else []
+        for column, counts in self.value_counts.items():
+            value = values[column].strip() if column < len(values) else ''
+            if value and counts[value] > 1:
+                problems.append((column, self._("'%(value)s' is not unique (%(count)s rows)") % {'value': value, 'count': counts[value]}))
+        return problems
+
+    def check_headers(self, headers, names):
+        """
+        Checks the column headers.
+
+        Args:
+            headers (list): Current column headers
+            names (dict): Zero-based column index -> column name used in the schema
+
+        Returns:
+            list: Messages for empty, duplicate or renamed schema columns
+        """
+        messages = []
+        if any(not header.strip() for header in headers):
+            messages.append(self._("Some column headers are empty."))
+        duplicates = [header for header, count in Counter(headers).items() if count > 1 and header.strip()]
+        if duplicates:
+            messages.append(self._("Duplicate column headers: %(headers)s") % {'headers': ', '.join(duplicates)})
+        for column, name in names.items():
+            if column < len(headers) and headers[column] != name:
+                messages.append(self._("Column '%(column)s' is checked with the rules for '%(name)s'.") % {'column': headers[column], 'name': name})
+        return messages
+
+
+class ColumnProfile:
+    """
+    Summary of one column built from a stream of values in fixed memory.
+
+    Values are counted exactly up to exact_limit distinct values. Beyond that, distinct values
+    are estimated with a HyperLogLog sketch and frequent values are kept with the Misra-Gries
+    algorithm, so memory does not grow with the number of rows.
+    """
+    exact_limit = 4096
+    frequent_capacity = 100
+    register_bits = 12
+
+    def __init__(self):
+        self.count = 0
+        self.empty_count = 0
+        self.exact_counts = Counter()  # Value -> count while there are few distinct values, then None
+        self.registers = None  # HyperLogLog registers
+        self.frequent = None  # Misra-Gries counters, lower bounds of the real counts
+        self.minimum = None
+        self.maximum = None
+        self.numeric = True  # All values so far are numbers, minimum and maximum compare numerically
+        self.length_counts = Counter()
+
+    def add_values(self, values):
+        """Adds a batch of values of the column."""
+        self.count += len(values)
+        self.length_counts.update(map(len, values))
+        batch_size = len(values)
+        values = [value for value in values if value.strip()]
+        self.empty_count += batch_size - len(values)
+        if not values:
+            return
+
+        self.numeric = self.numeric and all(map(Table.float_pattern.fullmatch, values))
+        if self.numeric:
+            candidates = [min(values, key=float), max(values, key=float)] + [v for v in (self.minimum, self.maximum) if v is not None]
+            self.minimum, self.maximum = min(candidates, key=float), max(candidates, key=float)
         else:
-            self.scriptdir = Path(__file__).parent.absolute()
+            candidates = [min(values), max(values)] + [v for v in (self.minimum, self.maximum) if v is not None]
+            self.minimum, self.maximum = min(candidates), max(candidates)
 
-        # Set a nice title for windows users
-        if os.name == 'nt': os.system('title Sivvy')
+        batch_counts = Counter(values)
+        if self.exact_counts is not None:
+            self.exact_counts.update(batch_counts)
+            if len(self.exact_counts) <= self.exact_limit:
+                return
+            # Too many distinct values to count exactly, continue with sketches
+            batch_counts, self.exact_counts = self.exact_counts, None
+            self.registers = bytearray(1 << self.register_bits)
+            self.frequent = Counter()
+
+        self._add_to_registers(batch_counts)
+        self.frequent.update(batch_counts)
+        if len(self.frequent) > self.frequent_capacity:
+            # Subtracting the count of the first counter beyond the capacity keeps the summary bounded
+            threshold = sorted(self.frequent.values(), reverse=True)[self.frequent_capacity]
+            self.frequent = Counter({value: count - threshold for value, count in self.frequent.items() if count > threshold})
+
+    def _add_to_registers(self, values):
+        """Adds distinct values to the HyperLogLog registers."""
+        bits = self.register_bits
+        mask = (1 << bits) - 1
+        rank_bits = 64 - bits + 1
+        registers = self.registers
+        for value in values:
+            hashed = hash(value) & 0xFFFFFFFFFFFFFFFF
+            register = hashed & mask
+            rank = rank_bits - (hashed >> bits).bit_length()
+            if rank > registers[register]:
+                registers[register] = rank
+
+    def distinct(self):
+        """
+        Returns the number of distinct non-empty values.
+
+        Returns:
+            tuple: (count, True if the count is exact)
+        """
+        if self.exact_counts is not None:
+            return len(self.exact_counts), True
+        size = len(self.registers)
+        estimate = 0.7213 / (1 + 1.079 / size) * size * size / sum(2.0 ** -rank for rank in self.registers)
+        empty_registers = self.registers.count(0)
+        if estimate <= 2.5 * size and empty_registers:
+            estimate = size * math.log(size / empty_registers)
+        return int(estimate), False
+
+    def top_values(self, count):
+        """Returns the most frequent values as (value, count) tuples, counts are lower bounds if not exact."""
+        counts = self.exact_counts if self.exact_counts is not None else self.frequent
+        return counts.most_common(count)
+
+    def length_statistics(self):
+        """Returns (minimum, mean, 95th percentile, maximum) of the value lengths."""
+        lengths = sorted(self.length_counts.items())
+        total = sum(length * count for length, count in lengths)
+        seen = 0
+        percentile = lengths[-1][0]
+        for length, count in lengths:
+            seen += count
+            if seen >= 0.95 * self.count:
+                percentile = length
+                break
+        return lengths[0][0], total / self.count, percentile, lengths[-1][0]
+
+
+class TableProfile:
+    """Profiles of all columns of a table and a uniform sample of its rows, built in one pass in fixed memory."""
+    sample_size = 5
+
+    def __init__(self, width):
+        self.columns = [ColumnProfile() for _ in range(width)]
+        self.row_count = 0
+        self.sample = []
+        self.sample_weight = None
+        self.next_sample = None
+
+    def add_rows(self, rows):
+        """Adds a batch of rows, padded or truncated to the number of columns."""
+        width = len(self.columns)
+        if width:
+            padded_rows = [row if len(row) == width else (row + [''] * (width - len(row)))[:width] for row in rows]
+            for column, values in zip(self.columns, zip(*padded_rows)):
+                column.add_values(values)
+        self._sample_rows(rows)
+        self.row_count += len(rows)
+
+    def _random_unit(self):
+        """Returns a random number in the open interval (0, 1)."""
+        while True:
+            number = random.random()
+            if number > 0:
+                return number
+
+    def _sample_rows(self, rows):
+        """Keeps a uniform sample of all rows with reservoir sampling (Algorithm L), skipping most rows."""
+        first_position = self.row_count
+        missing = self.sample_size - len(self.sample)
+        if missing > 0:
+            self.sample.extend(rows[:missing])
+            if len(self.sample) < self.sample_size:
+                return
+            self.sample_weight = math.exp(math.log(self._random_unit()) / self.sample_size)
+            self.next_sample = self.sample_size + int(math.log(self._random_unit()) / math.log(1 - self.sample_weight))
+
+        while self.next_sample < first_position + len(rows):
+            self.sample[random.randrange(self.sample_size)] = rows[self.next_sample - first_position]
+            self.sample_weight *= math.exp(math.log(self._random_unit()) / self.sample_size)
+            self.next_sample += int(math.log(self._random_unit()) / math.log(1 - self.sample_weight)) + 1
+
+
+# Table prepared by Sivvy.export_formats, set once in each export worker process
+_export_worker_table = None
+
+
+def _init_export_worker(table_data, table_headers, column_alignment):
+    """Receives the prepared table in an export worker process."""
+    global _export_worker_table
+    _export_worker_table = (table_data, table_headers, column_alignment)
+
+
+def _render_export(table_format, output_filename):
+    """
+    Renders the prepared table in one format and writes it to a file.
+
+    Returns:
+        float: Seconds needed for rendering and writing
+    """
+    start_time = time.perf_counter()
+    table_data, table_headers, column_alignment = _export_worker_table
+    table_output = tabulate(table_data, headers=table_headers, tablefmt=table_format, disable_numparse=True, colalign=column_alignment)
+    with open(output_filename, 'w', encoding='utf-8') as f:
+        print(table_output, file=f)
+    return time.perf_counter() - start_time
+
+
+class Table:
+    """
+    CSV table engine without any terminal interaction.
+
+    Loads a csv file with the same encoding fallback, delimiter detection, compression and
+    column selection as the editor, and keeps them when saving. Changes made with the batch
+    methods can be undone. Messages are collected in status_messages instead of being printed,
+    and no locale or signal handlers are set up, so the engine can be used from other programs:
+
+        table = Table('archive.csv')
+        table.set_cells((i, 'Status', 'checked') for i, row in enumerate(table.iter_rows()) if row[0])
+        table.save()
+    """
+    # Encodings tried in this order if a file is not valid UTF-8
+    fallback_encodings = ['latin1', 'cp1252', 'iso-8859-1']
 
+    # Supported compression formats: magic bytes, file extensions and opener
+    compression_formats = {
+        'gzip': (b'\x1f\x8b', ('.gz', '.gzip'), gzip.open),
+        'bz2': (b'BZh', ('.bz2',), bz2.open),
+        'xz': (b'\xfd7zXZ\x00', ('.xz', '.lzma'), lzma.open),
+    }
+
+    # Compression level for saving if none is given, faster than the gzip and bz2 default of 9
+    default_compression_level = 6
+
+    # Minimum number of characters read for delimiter detection
+    sniff_sample_size = 1024
+
+    # Bytes read from the start and from the end of a file to detect its encoding before appending to it
+    encoding_sample_size = 1024 * 1024
+
+    # Column type inference: number of rows sampled, recognized value patterns and date formats
+    type_sample_size = 1000
+    int_pattern = re.compile(r'[+-]?\d+', re.ASCII)
+    float_pattern = re.compile(r'[+-]?(\d+\.\d*|\.\d+|\d+)([eE][+-]?\d+)?', re.ASCII)
+    date_formats = ['%Y-%m-%d', '%d.%m.%Y', '%m/%d/%Y', '%Y/%m/%d']
+    typecodes = {'int': 'q', 'float': 'd', 'date': 'l'}  # Array type of the typed columns, dates as ordinals
+
+    # Distinct rows kept in memory when removing duplicates from a file, beyond that fingerprints are sorted externally
+    dedup_memory_limit = 1_000_000
+
+    # Files larger than this (in bytes) are loaded in the background after the first screen
+    progressive_load_threshold = 4 * 1024 * 1024
+    first_screen_rows = 100
+    load_batch_size = 10000
+
+    # Statements of user queries that are refused: attaching files and creating anything but indexes,
+    # which could also hide the mirrored table behind a temporary table of the same name
+    sql_denied_actions = frozenset((
+        sqlite3.SQLITE_ATTACH, sqlite3.SQLITE_DETACH, sqlite3.SQLITE_ALTER_TABLE, sqlite3.SQLITE_ANALYZE,
+        sqlite3.SQLITE_CREATE_TABLE, sqlite3.SQLITE_CREATE_TEMP_TABLE, sqlite3.SQLITE_CREATE_VIEW,
+        sqlite3.SQLITE_CREATE_TEMP_VIEW, sqlite3.SQLITE_CREATE_TRIGGER, sqlite3.SQLITE_CREATE_TEMP_TRIGGER,
+        sqlite3.SQLITE_CREATE_TEMP_INDEX, sqlite3.SQLITE_CREATE_VTABLE, sqlite3.SQLITE_DROP_TABLE,
+        sqlite3.SQLITE_DROP_TEMP_TABLE, sqlite3.SQLITE_DROP_VIEW, sqlite3.SQLITE_DROP_TEMP_VIEW,
+        sqlite3.SQLITE_DROP_TRIGGER, sqlite3.SQLITE_DROP_TEMP_TRIGGER, sqlite3.SQLITE_DROP_TEMP_INDEX,
+        sqlite3.SQLITE_DROP_VTABLE
+    ))
+    sql_allowed_pragmas = frozenset(('table_info', 'table_xinfo', 'index_list', 'index_info', 'index_xinfo'))
+
+    # Translation function for messages, replaced by the editor after setting up the locale
+    _ = staticmethod(gettext.gettext)
+
+    def __init__(self, filename, delimiter=None, columns=None, schema_filename=None, compression_level=None, headers=None, load_file=True, progressive=False):
+        """
+        Args:
+            filename (str): Path of the csv file, created with the given headers if it does not exist
+            delimiter (str): Column delimiter, None to detect it from the file
+            columns (list): Column names or numbers to load, None for all. The other columns are kept when saving.
+            schema_filename (str): Schema file, None for the sidecar file '<filename>.schema.json'
+            compression_level (int): Compression level 1-9 for compressed files
+            headers (list): Column headers of a new or empty file
+            load_file (bool): Load the file right away
+            progressive (bool): Load large files in a background thread after the first rows
+        """
         # Status message system
         self.status_messages = []
         self.max_status_messages = 10
-        self.show_all_messages = False
 
         # Parameters
         self.filename = filename
         self.data = []
         self.headers = []
-        self.delimiter = column_delimiter
-        self._manual_delimiter = manual_delimiter_set
-        self.display_range = display_range
-        self.deleted_rows = []  # Saves deleted rows for undo
+        self.delimiter = delimiter or ','
+        self._manual_delimiter = delimiter is not None
+        self.display_range = None  # Rows shown first, loaded before the rest of a large file
+        self.compression_level = compression_level
+        self.encoding = 'utf-8'  # Encoding the file was loaded with
+        self.new_file_headers = headers  # Headers of a new or empty file
+        self.progressive = progressive
+        self.selected_columns = columns  # Column names or numbers to load, None for all
+        self.column_projection = None  # Source column index of each loaded column if a selection is active
+        self.source_headers = []  # All headers of the file if a selection is active
+        self.row_origins = array('q')  # Source row of each loaded row, -1 for new rows
+        self.loaded_row_count = 0  # Rows read from the file so far
+        self.column_types = []  # 'int', 'float', 'date' or 'text' for each column
+        self.column_date_formats = {}  # Date format of each date column
+        self.typed_columns = None  # Column index -> (values array, validity mask), built on first use
+        self.table_modified = False  # Changed other than by appending rows, so saving rewrites the file
+        self.schema_filename = schema_filename  # Schema file given on the command line, None for the sidecar file
+        self.validator = None  # SchemaValidator if a schema file was found
+        self.schema_columns = {}  # Column index -> column name used in the schema
+        self.key_column = None  # Column index of the key column for lookups by key
+        self.key_index = None  # Key -> row position, None if it has to be rebuilt
+        self.duplicate_keys = Counter()  # Keys found more than once when the index was built
+
+        # Background loading of large files
+        self.loading = False
+        self.load_lock = threading.Lock()
+        self.load_thread = None
+        self.load_file = None
+        self.load_size = 0
+        self.load_error = None
+        self.load_incomplete = False  # Background loading failed, so the file must not be rewritten
+        self.undo_history = []  # Saves deleted rows and batch operations for undo
         self.max_undo_history = 10
+        self.sql_connection = None  # In-memory SQLite mirror, created on first query
+        self.sql_index_statements = []  # Re-applied when the mirror is rebuilt
+        self.column_map = None  # Stored position of each column after column operations, None if rows match the headers
+        self.column_defaults = {}  # Stored position -> value of new columns in rows without that cell, see _stored_cell
+        self.stored_width = 0  # Number of stored positions while a column map is active
 
-        # Setup our methods
-        self.setup_signal_handlers()
-        self.setup_localization()
-        self.check_table_format(table_format)
-        self._load_csv()
+        if load_file:
+            self._load_csv()
 
-    def clear_console(self):
-        """Clears the console screen."""
-        os.system('cls' if os.name == 'nt' else 'clear')
+    def __len__(self):
+        """Returns the number of rows, waiting until the file is loaded."""
+        self._wait_for_loading()
+        return len(self.data)
 
-    def setup_signal_handlers(self):
-        """Setup signal handlers for graceful termination"""
-        signal.signal(signal.SIGINT, self.handle_exit_signal)
-        signal.signal(signal.SIGTERM, self.handle_exit_signal)
+    def column_index(self, column):
+        """
+        Finds a column by zero-based index (int) or by header name (str).
 
-    def handle_exit_signal(self, signum, frame):
-        """Handle exit signals"""
-        print("\n Exiting...")
-        sys.exit(0)
+        Strings are always header names, also if they consist of digits: '2' is the column named '2'.
 
-    def setup_localization(self):
-        """Setup localization settings"""
-        system_language = locale.getlocale()
-        try:
-            if os.name == 'nt':
-                os.environ['LANG'] = system_language[0] + '.utf8'
-                locale.setlocale(locale.LC_ALL, system_language[0] + '.utf8')
-            else:
-                locale.setlocale(locale.LC_ALL, '')
-        except locale.Error as e:
-            print(f"Warning: Error while setting locale: {e} Trying fallback to default 'C' locale.")
-            try:
-                locale.setlocale(locale.LC_ALL, 'C')
-            except locale.Error as e_fallback:
-                print(f"Error falling back to 'C' locale: {e_fallback}. Locale not set.")
+        Raises:
+            ValueError: If the column does not exist
+        """
+        if isinstance(column, int):
+            if 0 <= column < len(self.headers):
+                return column
+        else:
+            column_index = self._resolve_column(self.headers, column, numbers=False)
+            if column_index is not None:
+                return column_index
+        raise ValueError(self._("Column '%(column)s' not found.") % {'column': column})
 
-        gettext.bindtextdomain('sivvy', str(self.scriptdir / 'locale'))
-        gettext.textdomain('sivvy')
-        self._ = gettext.gettext
+    def iter_rows(self, start=0, stop=None):
+        """
+        Iterates over the rows from start to stop (zero-based, stop excluded), padded or truncated to the headers.
 
-    def _validate_filename(self, filename):
+        Yields:
+            list: Row values. Rows of the right length are not copied, change them with set_cells.
         """
-        Validates a file name for problematic characters.
+        self._wait_for_loading()
+        width = len(self.headers)
+        for row in self._logical_rows(islice(self.data, start, stop)):
+            yield row if len(row) == width else (row + [''] * (width - len(row)))[:width]
+
+    def get_cell(self, row, column):
+        """Returns the value of a cell, '' if the row is shorter than the headers."""
+        self._wait_for_loading()
+        return self._cell(self.data[row], self.column_index(column))
+
+    def set_cell(self, row, column, value):
+        """Changes a single cell, see set_cells."""
+        return self.set_cells([(row, column, value)])
+
+    def set_cells(self, cells, description=None):
+        """
+        Changes many cells as a single operation that can be undone.
 
         Args:
-            filename (str): file name to validate
+            cells (iterable): (row, column, value) tuples with zero-based row positions and columns as for
+                column_index, values are converted to strings
+            description (str): Description of the change in the undo history
 
         Returns:
-            tuple: (is_valid, error_message)
-                - is_valid (bool): True if valid, False if not valid
-                - error_message (str): Error message for invalid file names
+            int: Number of changed cells
+
+        Raises:
+            IndexError: If a row does not exist
+            ValueError: If a column does not exist
         """
-        if not filename or not filename.strip():
-            return False, self._("Filename cannot be empty.")
+        self._wait_for_loading()
+        width = len(self.headers) if self.column_map is None else self.stored_width
+        positions = range(len(self.data))
+        changes = []
+        for row_index, column, value in cells:
+            row_index = positions[row_index]
+            column = self._stored_column(self.column_index(column))
+            value = str(value)
+            row = self.data[row_index]
+            if len(row) < width:
+                row = row + [self._stored_cell(row, position) for position in range(len(row), width)]
+                self._replace_row(row_index, row)
+            if row[column] != value:
+                changes.append((row, column, row[column], value))
+
+        if not changes:
+            return 0
+        self._set_cells([(row, column, value) for row, column, old_value, value in changes])
+        self._add_undo_entry({
+            'type': 'cells',
+            'description': description or self._("Changed %(cells)s cells") % {'cells': len(changes)},
+            'cells': [(row, column, old_value) for row, column, old_value, value in changes]
+        })
+        return len(changes)
+
+    def insert_rows(self, position, rows, description=None):
+        """
+        Inserts rows before a zero-based position as a single operation that can be undone.
 
-        # Remove whitespace
-        filename = filename.strip()
+        Args:
+            position (int): Position of the first new row, None or the number of rows to append them
+            rows (iterable): Rows as sequences of values, which are converted to strings
+            description (str): Description of the change in the undo history
 
-        # Check for problematic characters (Windows and Unix)
-        invalid_chars = '<>:"/\\|?*'
-        found_invalid = [char for char in invalid_chars if char in filename]
-        if found_invalid:
-            return False, self._("Invalid characters in filename: %(chars)s") % {
-                'chars': ', '.join(found_invalid)
-            }
+        Returns:
+            int: Number of inserted rows
+        """
+        self._wait_for_loading()
+        new_rows = [self._stored_row([str(value) for value in row]) for row in rows]
+        if not new_rows:
+            return 0
+
+        if position is None or position >= len(self.data):
+            self._extend_rows(new_rows)
+            # Appending alone does not mark the table as modified, so saving can append to the file
+            self._reset_sql_mirror()
+        else:
+            position = range(len(self.data))[position]
+            with self.load_lock:
+                self.data[position:position] = new_rows
+                if self.column_projection is not None:
+                    self.row_origins[position:position] = array('q', [-1] * len(new_rows))
+            self._schema_add_rows(new_rows)
+            self._typed_rows_inserted(range(position, position + len(new_rows)))
+            self._table_changed()
+
+        self._add_undo_entry({
+            'type': 'inserted',
+            'description': description or self._("Inserted %(rows)s rows") % {'rows': len(new_rows)},
+            'rows': new_rows
+        })
+        return len(new_rows)
+
+    def delete_rows(self, start, stop=None, description=None):
+        """
+        Deletes the rows from start to stop (zero-based, stop excluded, None for only the row at start)
+        as a single operation that can be undone.
 
-        # Check for reserved file names (Windows)
-        reserved_names = ['CON', 'PRN', 'AUX', 'NUL', 'COM1', 'COM2', 'COM3', 'COM4', 
-                         'COM5', 'COM6', 'COM7', 'COM8', 'COM9', 'LPT1', 'LPT2', 'LPT3', 
-                         'LPT4', 'LPT5', 'LPT6', 'LPT7', 'LPT8', 'LPT9']
+        Returns:
+            int: Number of deleted rows
+        """
+        self._wait_for_loading()
+        positions = range(len(self.data))
+        positions = positions[start:start + 1 or None] if stop is None else positions[start:stop]
+        if not positions:
+            return 0
+        removed_rows = self._remove_rows(set(positions))
+        self._add_undo_entry({
+            'type': 'rows',
+            'description': description or self._("Deleted %(rows)s rows") % {'rows': len(removed_rows)},
+            'rows': removed_rows
+        })
+        return len(removed_rows)
+
+    def insert_column(self, header, position=None, default=''):
+        """
+        Inserts a column as a single operation that can be undone.
 
-        name_without_ext = filename.split('.')[0].upper()
-        if name_without_ext in reserved_names:
-            return False, self._("'%(name)s' is a reserved filename.") % {'name': filename}
+        Rows are not changed, they show the default value until a cell of the new column is set.
 
-        # Check for long file names (255 chars)
-        if len(filename) > 255:
-            return False, self._("Filename is too long (maximum 255 characters).")
+        Args:
+            header (str): Name of the new column
+            position: Column before which the new column is inserted, as for column_index, None to add it at the end
+            default (str): Value of the new column in all rows
 
-        # Check if file name only contains dots
-        if filename.replace('.', '').strip() == '':
-            return False, self._("Filename cannot consist only of dots.")
+        Returns:
+            str: Description of the change in the undo history
+        """
+        column_map = self._prepare_column_change()
+        index = len(column_map) if position is None else self.column_index(position)
+        headers = list(self.headers)
+        headers.insert(index, header)
+        column_map.insert(index, self.stored_width)
+        column_defaults = dict(self.column_defaults)
+        column_defaults[self.stored_width] = str(default)
+        return self._change_column_layout(
+            self._("Inserted column '%(column)s'") % {'column': header}, headers, column_map, column_defaults,
+            self.stored_width + 1
+        )
 
-        return True, ""
+    def drop_column(self, column):
+        """
+        Removes a column as a single operation that can be undone.
 
-    def show_message(self, message, msg_type='info', pause=False, store=True):
+        The cells stay in the rows until they are saved, so the column can be restored.
+
+        Returns:
+            str: Description of the change in the undo history
+
+        Raises:
+            ValueError: If the column does not exist or is the last column
         """
-        Unified message handling system.
+        column_map = self._prepare_column_change()
+        index = self.column_index(column)
+        if len(column_map) == 1:
+            raise ValueError(self._("The last column cannot be removed."))
+        headers = list(self.headers)
+        header = headers.pop(index)
+        del column_map[index]
+        return self._change_column_layout(
+            self._("Removed column '%(column)s'") % {'column': header}, headers, column_map, self.column_defaults
+        )
+
+    def move_column(self, column, position=None):
+        """
+        Moves a column as a single operation that can be undone.
 
         Args:
-            message (str): The message to display
-            msg_type (str): 'info', 'warning', 'error' - determines formatting and behavior
-            persist (bool): Whether message should persist across screen clears
-            pause (bool): Whether to pause for user input after displaying
-            store (bool): Whether to store message in status list
+            column: Column to move, as for column_index
+            position: Column before which it is moved, as for column_index, None to move it to the end
+
+        Returns:
+            str: Description of the change in the undo history
+        """
+        column_map = self._prepare_column_change()
+        index = self.column_index(column)
+        target = len(column_map) if position is None else self.column_index(position)
+        if target > index:
+            target -= 1
+        headers = list(self.headers)
+        header = headers.pop(index)
+        headers.insert(target, header)
+        column_map.insert(target, column_map.pop(index))
+        return self._change_column_layout(
+            self._("Moved column '%(column)s'") % {'column': header}, headers, column_map, self.column_defaults
+        )
+
+    def rename_column(self, column, header):
         """
+        Renames a column as a single operation that can be undone.
 
-        # Format message based on type
-        formatted_message = self._format_message(message, msg_type)
+        Returns:
+            str: Description of the change in the undo history
+        """
+        self._wait_for_loading()
+        index = self.column_index(column)
+        headers = list(self.headers)
+        old_header = headers[index]
+        headers[index] = header
+        return self._change_column_layout(
+            self._("Renamed column '%(old)s' to '%(new)s'") % {'old': old_header, 'new': header},
+            headers, self.column_map, self.column_defaults
+        )
+
+    def split_column(self, column, separator, headers):
+        """
+        Replaces a column by columns holding the parts of its values, as a single operation that can be undone.
+
+        Values are split at the first occurrences of the separator, the last new column keeps the rest.
+
+        Args:
+            column: Column to split, as for column_index
+            separator (str): Text between the parts
+            headers (list): Names of the new columns, at least two
+
+        Returns:
+            str: Description of the change in the undo history
+        """
+        if not separator:
+            raise ValueError(self._("Please enter a separator."))
+        if len(headers) < 2:
+            raise ValueError(self._("Please enter at least two column names."))
+
+        column_map = self._prepare_column_change()
+        index = self.column_index(column)
+        source = column_map[index]
+        part_count = len(headers)
+
+        # The parts are computed from the source cell until they are set or the table is saved
+        first_position = self.stored_width
+        column_defaults = dict(self.column_defaults)
+        for part in range(part_count):
+            column_defaults[first_position + part] = ('split', source, separator, part, part_count)
+        new_headers = list(self.headers)
+        new_headers[index:index + 1] = headers
+        column_map[index:index + 1] = range(first_position, first_position + part_count)
+        return self._change_column_layout(
+            self._("Split column '%(column)s' into %(count)s columns") % {'column': self.headers[index], 'count': part_count},
+            new_headers, column_map, column_defaults, first_position + part_count
+        )
+
+    def merge_columns(self, columns, header, separator=' '):
+        """
+        Replaces columns by one column joining their non-empty values, as a single operation that can be undone.
+
+        Args:
+            columns (list): Columns to merge in this order, as for column_index
+            header (str): Name of the merged column, which takes the place of the first of the merged columns
+            separator (str): Text between the values
+
+        Returns:
+            str: Description of the change in the undo history
+        """
+        column_map = self._prepare_column_change()
+        indexes = list(dict.fromkeys(self.column_index(column) for column in columns))
+        if len(indexes) < 2:
+            raise ValueError(self._("Please enter at least two columns."))
+
+        # The merged value is computed from the source cells until it is set or the table is saved
+        position = self.stored_width
+        column_defaults = dict(self.column_defaults)
+        column_defaults[position] = ('merge', tuple(column_map[index] for index in indexes), separator)
+        first_index = min(indexes)
+        new_headers = []
+        new_column_map = []
+        for index, (old_header, stored_position) in enumerate(zip(self.headers, column_map)):
+            if index == first_index:
+                new_headers.append(header)
+                new_column_map.append(position)
+            elif index not in indexes:
+                new_headers.append(old_header)
+                new_column_map.append(stored_position)
+        return self._change_column_layout(
+            self._("Merged %(count)s columns into '%(column)s'") % {'count': len(indexes), 'column': header},
+            new_headers, new_column_map, column_defaults, position + 1
+        )
+
+    def undo(self):
+        """
+        Undoes the most recent operation in the undo history.
+
+        Returns:
+            str: Description of the undone operation, None if there is nothing to undo
+        """
+        if not self.undo_history:
+            return None
+        entry = self.undo_history.pop()
+        if entry['type'] == 'row':
+            self._insert_row(min(entry['index'], len(self.data)), entry['data'], entry['origin'])
+            return f"{self._('Row')} {entry['index'] + 1}"
+        self._undo_batch(entry)
+        return entry['description']
+
+    def query(self, statement, parameters=()):
+        """
+        Runs an SQL statement against an in-memory copy of the table.
+
+        The table is called 'data', its first column '_row' is the row number, so SELECT * returns it as well.
+        The copy is kept in sync with changes, and indexes created with CREATE INDEX are kept. Statements can
+        only read 'data' and create or drop indexes, other tables, views and attached databases are refused.
+
+        Returns:
+            tuple: (column names, result rows), column names is None for statements without a result
 
+        Raises:
+            sqlite3.Error: If the statement fails
+        """
+        self._wait_for_loading()
+        if self.sql_connection is None:
+            self._build_sql_mirror()
+
+        connection = self.sql_connection
+        connection.set_authorizer(self._sql_authorizer)
+        try:
+            cursor = connection.execute(statement, parameters)
+            result_rows = cursor.fetchall()
+            connection.commit()
+        finally:
+            connection.set_authorizer(None)
+
+        if cursor.description is None:
+            # Indexes created or dropped by the statement are kept for the next rebuild
+            self.sql_index_statements = [
+                sql for sql, in connection.execute(
+                    "SELECT sql FROM main.sqlite_master WHERE type = 'index' AND name != 'data_row' AND sql IS NOT NULL"
+                )
+            ]
+            return None, result_rows
+        return [column[0] for column in cursor.description], result_rows
+
+    def save(self):
+        """
+        Writes the table to its file.
+
+        Columns that were not loaded are merged back from the file. If rows were only appended
+        to an uncompressed file, just the new rows are written at its end.
+
+        Raises:
+            OSError: If the file cannot be written, or would be rewritten although it was not loaded completely
+        """
+        self._wait_for_loading()
+        if self.load_incomplete and not self.table_modified and len(self.data) == self.loaded_row_count:
+            # Nothing to write, and the file must not be rewritten
+            return
+        rewrite = self.column_projection is not None or self.table_modified or not self._can_append_to_file()
+        if self.load_incomplete and rewrite:
+            # Rewriting would drop all rows that could not be loaded
+            raise OSError(self._("The file was not loaded completely, saving it would lose the rows that were not loaded."))
+        if self.column_projection is not None:
+            self._save_projected_csv()
+            self.encoding = 'utf-8'
+        elif not self.table_modified and self._can_append_to_file():
+            self._append_rows_to_file(self._logical_rows(self.data[self.loaded_row_count:]))
+        else:
+            with self._open_csv_file(self.filename, 'w') as csvfile:
+                writer = csv.writer(csvfile, delimiter=self.delimiter)
+                if self.headers:
+                    writer.writerow(self.headers)
+                else:
+                    writer.writerow(["Column 1", "Column 2", "Column 3"])
+
+                # Rows are written in the order of the headers, the column map stays until needed
+                writer.writerows(self._logical_rows(self.data))
+            self.encoding = 'utf-8'
+        # The file matches the table now, further saves can append again
+        self.table_modified = False
+        self.loaded_row_count = len(self.data)
+
+    def _save_csv(self, initial_save=False):
+        """Saves the table. The editor reports the result instead of raising errors."""
+        self.save()
+
+    def show_message(self, message, msg_type='info', pause=False, store=True):
+        """
+        Records a message in the status list, the editor also prints warnings and errors.
+
+        Args:
+            message (str): The message
+            msg_type (str): 'info', 'warning' or 'error'
+            pause (bool): Whether the editor waits for the user after displaying it
+            store (bool): Whether to store message in status list
+        """
         if store:
             self.status_messages.append({
-                'message': formatted_message,
+                'message': message,
                 'type': msg_type,
                 'timestamp': self._get_current_time()
             })
@@ -176,87 +990,38 @@ class Sivvy:
             if len(self.status_messages) > self.max_status_messages:
                 self.status_messages.pop(0)
 
-        if msg_type == 'error' or msg_type == 'warning' or pause:
-            print(formatted_message)
-            if pause or msg_type == 'error':
-                input(self._("Press Enter to continue..."))
+    def _headers_for_new_file(self):
+        """Returns the headers of a new or empty file."""
+        return list(self.new_file_headers or ["Column 1", "Column 2", "Column 3"])
+
+    def _wait_for_loading(self):
+        """Waits until background loading has finished. Needed by operations that work on the whole table."""
+        if self.load_thread is not None:
+            self.load_thread.join()
+        self._check_loading()
 
     def _get_current_time(self):
         """Returns a simple timestamp."""
         return time.strftime("%H:%M:%S")
 
-    def display_status_messages(self):
-        """Show all saved status messages."""
-        if not self.status_messages:
-            return
-
-        print("=" * 50)
-        print(self._("Status Messages:"))
-        print("=" * 50)
-
-        messages_to_show = self.status_messages
-        if not self.show_all_messages and len(self.status_messages) > 5:
-            messages_to_show = self.status_messages[-5:]
-            print(self._("(Showing last 5 messages - enter 's' to see all)"))
-
-        for msg in messages_to_show:
-            print(f"[{msg['timestamp']}] {msg['message']}")
-
-        print("=" * 50)
-
     def clear_status_messages(self):
         """Deletes all saved messages."""
         self.status_messages = []
 
-    def toggle_message_display(self):
-        """Switches between compact and full message display."""
-        self.show_all_messages = not self.show_all_messages
-        status = self._("all") if self.show_all_messages else self._("recent")
-        self.show_message(
-            self._("Message display mode: %(mode)s") % {'mode': status}, 
-            'info', 
-            store=False
-        )
-
-    def _format_message(self, message, msg_type):
-        """Format message based on type."""
-        if msg_type == 'error':
-            return f"\a❌ {message}"  # Bell sound + error icon
-        elif msg_type == 'warning':
-            return f"⚠  {message}"   # Warning icon
-        else:
-            return f"ℹ  {message}"    # Info icon
-
-    def _get_headers_from_user(self):
-        """Prompts the user to enter column names."""
-        print(self._("Please enter column names separated by commas."))
-        header_input = input(self._("Column names: "))
-        headers = [h.strip() for h in header_input.split(',') if h.strip()]
-        if not headers:
-            self.show_message(self._("No column names entered. Using default headers."), 'info')
-            headers = ["Column 1", "Column 2", "Column 3"]
-        return headers
-
-    def check_table_format(self, table_format):
-        """Check if table output format is valid, otherwise use default."""
-        if table_format in self.SUPPORTED_TABLE_FORMATS:
-            self.table_format = table_format
-        else:
-            self.show_message(self._("Warning: Invalid output format '%(format)s' entered. Falling back to default format 'simple'.") % {'format': table_format}, 'warning')
-            self.table_format = "simple"
-
     def _load_csv(self):
-        """Loads a csv file or creates a new one."""
+        """Loads a csv file or creates a new one. Large files continue loading in the background."""
         try:
-            with open(self.filename, 'r', newline='', encoding='utf-8') as csvfile:
-                content = csvfile.read()
+            with ExitStack() as file_context:
+                csvfile = file_context.enter_context(self._open_csv_file(self.filename))
+                sample_lines = self._read_sample_lines(csvfile)
+                content_sample = ''.join(sample_lines)
 
-                if not content.strip():
+                if not content_sample.strip():
                     self.show_message(
                         self._("File '%(file)s' is empty. Please enter column names:") % {'file': self.filename},
                         'warning'
                     )
-                    self.headers = self._get_headers_from_user()
+                    self.headers = self._headers_for_new_file()
                     # self.delimiter = ','
                     self._save_csv(initial_save=True)
                     self.show_message(
@@ -266,7 +1031,7 @@ class Sivvy:
                     return
 
                 if not self._manual_delimiter:
-                    detected_delimiter = self._detect_delimiter_from_content(content)
+                    detected_delimiter = self._detect_delimiter_from_content(content_sample)
                     if detected_delimiter != self.delimiter:
                         self.delimiter = detected_delimiter
                 else:
@@ -276,12 +1041,23 @@ class Sivvy:
                         'info'
                     )
 
-                csvfile_in_memory = StringIO(content)
-                reader = csv.reader(csvfile_in_memory, delimiter=self.delimiter)
+                # The sample lines are parsed first, the rest is streamed from the file
+                reader = csv.reader(chain(sample_lines, csvfile), delimiter=self.delimiter)
 
                 try:
-                    self.headers = next(reader)
-                    self.data = list(reader)
+                    file_size = os.path.getsize(self.filename)
+                    if self.progressive and file_size > self.progressive_load_threshold:
+                        row_limit = self.first_screen_rows
+                        if self.display_range:
+                            row_limit = max(row_limit, self.display_range[1])
+
+                        if not self._read_table(reader, row_limit):
+                            # The background thread owns the file from here on
+                            file_context.pop_all()
+                            self._start_background_loading(csvfile, reader, file_size)
+                            return
+                    else:
+                        self._read_table(reader)
 
                     self.show_message(
                         self._("Loaded file '%(file)s' with %(rows)s rows.") % {
@@ -296,7 +1072,8 @@ class Sivvy:
                         self._("File exists but appears to be empty after reading."), 
                         'warning'
                     )
-                    self.headers = self._get_headers_from_user()
+                    self.headers = self._headers_for_new_file()
+                    self.table_modified = True
                     # self.delimiter = ','
 
         except FileNotFoundError:
@@ -304,7 +1081,7 @@ class Sivvy:
                 self._("File '%(file)s' not found. Creating a new file.") % {'file': self.filename}, 
                 'warning',
             )
-            self.headers = self._get_headers_from_user()
+            self.headers = self._headers_for_new_file()
             # self.delimiter = ','
             self._save_csv(initial_save=True)
 
@@ -322,6 +1099,293 @@ class Sivvy:
             )
             self._try_alternative_encodings()
 
+        except (OSError, EOFError, lzma.LZMAError) as e:
+            # gzip and bz2 report corrupt data as OSError, other OSErrors of uncompressed files are passed on
+            if isinstance(e, OSError) and self._detect_compression(self.filename) is None:
+                raise
+            self.show_message(
+                self._("Cannot decompress file '%(file)s': %(error)s") % {'file': self.filename, 'error': e},
+                'error'
+            )
+            raise
+
+    def _read_table(self, reader, row_limit=None):
+        """
+        Reads headers and rows from a csv reader into the table, keeping only the selected columns.
+
+        Args:
+            reader: csv reader positioned at the header row
+            row_limit (int): Maximum number of rows to read, None for all rows
+
+        Returns:
+            bool: True if the reader is exhausted, False if rows may remain
+
+        Raises:
+            StopIteration: If the reader has no header row
+        """
+        headers = next(reader)
+        self.column_projection = self._resolve_column_selection(headers)
+        self.key_index = None
+        self.data = []
+        self.row_origins = array('q')
+        self.loaded_row_count = 0
+        self.load_incomplete = False
+        self.column_map = None
+        self.column_defaults = {}
+
+        if self.column_projection is None:
+            self.headers = headers
+        else:
+            self.source_headers = headers
+            self.headers = [headers[i] for i in self.column_projection]
+            self.show_message(
+                self._("Showing %(selected)s of %(total)s columns. The other columns are kept when saving.") % {
+                    'selected': len(self.column_projection),
+                    'total': len(headers)
+                },
+                'info'
+            )
+        self._load_schema()
+
+        if row_limit is None:
+            self._append_loaded_rows(reader)
+        else:
+            self._append_loaded_rows(islice(reader, row_limit))
+        self._infer_column_types()
+
+        exhausted = row_limit is None or self.loaded_row_count < row_limit
+        if exhausted:
+            self._show_schema_summary()
+        return exhausted
+
+    def _append_loaded_rows(self, rows):
+        """Appends rows read from the file to the table, keeping only the selected columns."""
+        projection = self.column_projection
+        row_count = len(self.data)
+
+        if projection is None:
+            self.data.extend(rows)
+        else:
+            width = max(projection) + 1
+            if len(projection) == 1:
+                self.data.extend([row[projection[0]] if len(row) >= width else ''] for row in rows)
+            else:
+                select = itemgetter(*projection)
+                self.data.extend(
+                    list(select(row)) if len(row) >= width else [row[i] if i < len(row) else '' for i in projection]
+                    for row in rows
+                )
+
+        added_rows = len(self.data) - row_count
+        if self.validator is not None:
+            for row in self.data[row_count:]:
+                self.validator.add_row(row)
+        if projection is not None:
+            self.row_origins.extend(range(self.loaded_row_count, self.loaded_row_count + added_rows))
+        self.loaded_row_count += added_rows
+
+    def _start_background_loading(self, csvfile, reader, file_size):
+        """Continues reading the remaining rows of a large file in a background thread."""
+        self.loading = True
+        self.load_file = csvfile
+        self.load_size = file_size
+        self.load_error = None
+        self.load_thread = threading.Thread(target=self._load_remaining_rows, args=(csvfile, reader), daemon=True)
+        self.load_thread.start()
+        self.show_message(
+            self._("Showing the first rows of '%(file)s', loading the rest in the background.") % {'file': self.filename},
+            'info'
+        )
+
+    def _load_remaining_rows(self, csvfile, reader):
+        """Background thread: reads the remaining rows in batches."""
+        try:
+            with csvfile:
+                while True:
+                    batch = list(islice(reader, self.load_batch_size))
+                    if not batch:
+                        break
+                    with self.load_lock:
+                        self._append_loaded_rows(batch)
+        except Exception as e:
+            self.load_error = e
+        finally:
+            self.loading = False
+
+    def _loading_progress(self):
+        """
+        Returns the background loading progress.
+
+        Returns:
+            tuple: (rows loaded so far, percentage of the file read)
+        """
+        if not self.loading:
+            return self.loaded_row_count, 100
+        try:
+            binary_stream = self.load_file.buffer
+            if isinstance(binary_stream.raw, ReadAheadReader):
+                position = binary_stream.raw.source.tell()
+            else:
+                position = binary_stream.tell()
+            percent = min(100, int(position * 100 / self.load_size))
+        except (OSError, ValueError, AttributeError):
+            percent = 0
+        return self.loaded_row_count, percent
+
+    def _check_loading(self):
+        """Reports the end of background loading, falling back to other encodings on decoding errors."""
+        if self.load_thread is None or self.loading:
+            return
+
+        self.load_thread.join()
+        self.load_thread = None
+        self.load_file = None
+
+        if isinstance(self.load_error, UnicodeDecodeError):
+            self.show_message(
+                self._("File encoding error: %(error)s. Trying different encoding...") % {'error': self.load_error},
+                'warning'
+            )
+            self.show_message(
+                self._("The file is reloaded, changes made while it was loading are discarded."),
+                'warning'
+            )
+            # Undo entries, the key index and typed columns refer to the rows that are discarded
+            self.undo_history = []
+            self.key_index = None
+            self.typed_columns = None
+            self._reset_sql_mirror()
+            self._try_alternative_encodings()
+            # The file was read completely with another encoding
+            self.load_error = None
+            self.table_modified = False
+        elif self.load_error is not None:
+            self.load_incomplete = True
+            self.show_message(
+                self._("Loading stopped after %(rows)s rows: %(error)s") % {'rows': self.loaded_row_count, 'error': self.load_error},
+                'error'
+            )
+            self.show_message(
+                self._("The file will not be rewritten when saving, only new rows can be appended."),
+                'warning'
+            )
+        else:
+            self.show_message(
+                self._("Loaded file '%(file)s' with %(rows)s rows.") % {
+                    'file': self.filename,
+                    'rows': self.loaded_row_count
+                },
+                'info'
+            )
+            self._show_schema_summary()
+
+    def _resolve_column_selection(self, headers):
+        """
+        Resolves the columns selected on the command line against the file headers.
+
+        Returns:
+            list: Source column indexes to load, or None to load all columns
+        """
+        if not self.selected_columns:
+            return None
+
+        projection = []
+        for column in self.selected_columns:
+            index = self._resolve_column(headers, column)
+            if index is None:
+                self.show_message(
+                    self._("Column '%(column)s' not found, ignoring it.") % {'column': column},
+                    'warning'
+                )
+            elif index not in projection:
+                projection.append(index)
+
+        if not projection:
+            self.show_message(self._("No valid columns selected. Loading all columns."), 'warning')
+            return None
+        if len(projection) == len(headers) and projection == list(range(len(headers))):
+            return None
+        return projection
+
+    def _detect_compression(self, filename):
+        """
+        Detects the compression format of a file by its magic bytes or, for new files, by its extension.
+
+        Returns:
+            str: Key of compression_formats, or None for uncompressed files
+        """
+        try:
+            with open(filename, 'rb') as f:
+                magic = f.read(6)
+        except OSError:
+            magic = b''
+
+        if magic:
+            for name, (magic_bytes, _, _) in self.compression_formats.items():
+                if magic.startswith(magic_bytes):
+                    return name
+            return None
+
+        suffix = Path(filename).suffix.lower()
+        for name, (_, extensions, _) in self.compression_formats.items():
+            if suffix in extensions:
+                return name
+        return None
+
+    def _open_csv_file(self, filename, mode='r', encoding='utf-8', compression='detect'):
+        """
+        Opens a csv file in text mode, transparently handling compressed files.
+
+        Compressed files are decompressed in a background thread while being read and
+        compressed on the fly while being written.
+
+        Args:
+            filename (str): Path of the csv file
+            mode (str): 'r' or 'w', or 'a' for uncompressed files
+            encoding (str): Text encoding
+            compression (str): Compression format, 'detect' to detect it from the file
+
+        Returns:
+            file object: Text stream suitable for the csv module
+        """
+        if compression == 'detect':
+            compression = self._detect_compression(filename)
+        if compression is None:
+            return open(filename, mode, newline='', encoding=encoding)
+
+        opener = self.compression_formats[compression][2]
+        if mode == 'r':
+            source = open(filename, 'rb')
+            binary_stream = ReadAheadReader(opener(source, 'rb'), source)
+            return io.TextIOWrapper(io.BufferedReader(binary_stream), encoding=encoding, newline='')
+
+        level = self.compression_level if self.compression_level is not None else self.default_compression_level
+        if compression == 'xz':
+            binary_stream = opener(filename, 'wb', preset=level)
+        else:
+            binary_stream = opener(filename, 'wb', compresslevel=level)
+        return io.TextIOWrapper(binary_stream, encoding=encoding, newline='')
+
+    def _read_sample_lines(self, csvfile):
+        """
+        Reads the first lines of an open file for delimiter detection.
+
+        Reads at least sniff_sample_size characters unless the file is shorter, skipping leading blank content.
+
+        Returns:
+            list: The lines read, to be parsed before the rest of the file
+        """
+        sample_lines = []
+        sample_size = 0
+        has_content = False
+        for line in csvfile:
+            sample_lines.append(line)
+            sample_size += len(line)
+            has_content = has_content or bool(line.strip())
+            if sample_size >= self.sniff_sample_size and has_content:
+                break
+        return sample_lines
+
     def _detect_delimiter_from_content(self, content):
         """Detects delimiter from file content."""
         try:
@@ -411,28 +1475,26 @@ class Sivvy:
 
     def _try_alternative_encodings(self):
         """Fallback method to try different encodings if UTF-8 fails."""
-        alternative_encodings = ['latin1', 'cp1252', 'iso-8859-1']
-
-        for encoding in alternative_encodings:
+        for encoding in self.fallback_encodings:
             try:
                 self.show_message(
                     self._("Trying encoding: %(encoding)s") % {'encoding': encoding},
                     'info'
                 )
 
-                with open(self.filename, 'r', newline='', encoding=encoding) as csvfile:
-                    content = csvfile.read()
+                with self._open_csv_file(self.filename, encoding=encoding) as csvfile:
+                    sample_lines = self._read_sample_lines(csvfile)
+                    content_sample = ''.join(sample_lines)
 
-                    if not content.strip():
+                    if not content_sample.strip():
                         continue
 
-                    self.delimiter = self._detect_delimiter_from_content(content)
+                    self.delimiter = self._detect_delimiter_from_content(content_sample)
 
-                    csvfile_in_memory = StringIO(content)
-                    reader = csv.reader(csvfile_in_memory, delimiter=self.delimiter)
+                    reader = csv.reader(chain(sample_lines, csvfile), delimiter=self.delimiter)
 
-                    self.headers = next(reader)
-                    self.data = list(reader)
+                    self._read_table(reader)
+                    self.encoding = encoding
 
                     self.show_message(
                         self._("Successfully loaded with encoding %(encoding)s.") % {'encoding': encoding},
@@ -455,376 +1517,3279 @@ class Sivvy:
         )
         raise UnicodeDecodeError("All encodings failed", b"", 0, 1, "Cannot decode file")
 
-    def _save_csv(self, initial_save=False):
-        """Saves current data to csv file."""
-        try:
-            with open(self.filename, 'w', newline='', encoding='utf-8') as csvfile:
-                writer = csv.writer(csvfile, delimiter=self.delimiter)
-                if self.headers:
-                    writer.writerow(self.headers)
-                else: 
-                    writer.writerow(["Column 1", "Column 2", "Column 3"])
+    def _read_csv_file(self, filename):
+        """
+        Reads a complete csv file without changing the open table.
 
-                writer.writerows(self.data)
-            if not initial_save:
-                # No special status messages here as the program exits anyway
-                print(self._("Saved changes in '%(file)s'.") % {'file': self.filename})
-        except IOError as e:
-            print(self._("Error saving '%(file)s': %(error)s") % {'file': self.filename, 'error': e})
-        except Exception as e:
-            print(self._("An unexpected error occurred while saving: %(error)s") % {'error': e})
+        Uses the same encoding fallback and delimiter detection as _load_csv.
 
-    def display_table(self, output_filename=None, show_index=True):
-        """Displays data in the terminal as a formatted table, optionally with row limit."""
-        data_to_display = self.data
-        start_row, end_row = None, None
+        Args:
+            filename (str): Path of the csv file
 
-        if self.display_range:
-            start_row = max(0, self.display_range[0] - 1) 
-            end_row = min(len(self.data), self.display_range[1]) 
+        Returns:
+            tuple: (headers, rows, delimiter)
 
-            if start_row < end_row:
-                data_to_display = self.data[start_row:end_row]
-                print("\n--- " + self._("Displaying rows %(start)s to %(end)s") % {'start': start_row + 1, 'end': end_row} + " ---")
-            else:
-                self.show_message("\n" + self._("Invalid or empty display range. Loading the entire file."), 'warning')
-                data_to_display = self.data 
-                self.display_range = None
-                start_row, end_row = None, None
+        Raises:
+            OSError: If the file cannot be opened or decompressed
+            UnicodeDecodeError: If no supported encoding can decode the file
+        """
+        return self._stream_csv_file(filename, lambda headers, rows, delimiter, encoding: (headers, list(rows), delimiter))
 
-        if show_index:
-            indexed_data = []
-            for i, row in enumerate(data_to_display):
-                original_index = (i + 1) + (start_row if start_row is not None else 0)
-                padded_row = row + [''] * (len(self.headers) - len(row))
-                indexed_data.append([original_index] + padded_row[:len(self.headers)]) 
-
-            indexed_headers = [self._("Index")] + self.headers
-            table_data = indexed_data
-            table_headers = indexed_headers
-        else:
-            table_data = []
-            for row in data_to_display:
-                padded_row = row + [''] * (len(self.headers) - len(row))
-                table_data.append(padded_row[:len(self.headers)])
+    def _stream_csv_file(self, filename, process):
+        """
+        Streams the rows of a csv file through a function without loading the file.
 
-            table_headers = self.headers
+        Uses the same encoding fallback and delimiter detection as _load_csv. If a later
+        part of the file cannot be decoded, the function is called again from the start
+        with the next encoding, so it must be able to start over.
 
-        table_output = tabulate(table_data, headers=table_headers, tablefmt=self.table_format, disable_numparse=True)
+        Args:
+            filename (str): Path of the csv file, '-' for standard input
+            process (callable): Called with (headers, rows, delimiter, encoding), rows is an iterator
 
-        if output_filename:
+        Returns:
+            The return value of process
+
+        Raises:
+            OSError: If the file cannot be opened or decompressed
+            UnicodeDecodeError: If no supported encoding can decode the file
+        """
+        if filename == '-':
+            # Standard input can only be read once, so its own encoding is used
+            return self._process_csv_stream(sys.stdin, sys.stdin.encoding, process)
+
+        for encoding in ['utf-8'] + self.fallback_encodings:
             try:
-                output_path = Path(output_filename)
-                output_path.parent.mkdir(parents=True, exist_ok=True)
-                with open(output_filename, 'w', encoding='utf-8') as f:
-                    print(table_output, file=f)
-                self.show_message(
-                    self._("The current table's output was exported to file '%(file)s'.") % {'file': output_filename},
-                    'info'
-                )
+                with self._open_csv_file(filename, encoding=encoding) as csvfile:
+                    return self._process_csv_stream(csvfile, encoding, process)
+            except UnicodeDecodeError:
+                continue
 
-            except PermissionError:
-                self.show_message(
-                    self._("Permission denied: Cannot access file '%(file)s'.") % {'file': output_filename},
-                    'error',
-                    store=False
-                )
-                print(table_output)
+        raise UnicodeDecodeError("All encodings failed", b"", 0, 1, "Cannot decode file")
 
-            except OSError as e:
-                self.show_message(
-                    self._("Error saving '%(file)s': %(error)s") % {'file': output_filename, 'error': e},
-                    'error',
-                    store=False
-                )
-                print(table_output)
+    def _process_csv_stream(self, csvfile, encoding, process):
+        """Detects the delimiter of an open text stream and passes its rows to a function."""
+        sample_lines = self._read_sample_lines(csvfile)
+        content_sample = ''.join(sample_lines)
+        if not content_sample.strip():
+            return process([], iter(()), self.delimiter, encoding)
 
-            except Exception as e:
-                self.show_message(
-                    self._("An unexpected error occurred while saving: %(error)s") % {'error': e},
-                    'error',
-                    store=False
-                )
-                print(table_output)
+        delimiter = self.delimiter if self._manual_delimiter else self._detect_delimiter_from_content(content_sample)
+        reader = csv.reader(chain(sample_lines, csvfile), delimiter=delimiter)
+        headers = next(reader, [])
+        return process(headers, reader, delimiter, encoding)
 
-        else:
-            print(table_output)
+    def _can_append_to_file(self):
+        """Checks whether new rows can be appended to the file on disk instead of rewriting it."""
+        try:
+            return os.path.getsize(self.filename) > 0 and self._detect_compression(self.filename) is None
+        except OSError:
+            return False
 
-    def _edit_headers(self):
-        """Edits the column headers."""
-        print("\n--- " + self._("Editing column headers") + " ---")
-        print(self._("Enter new values. Leave empty to retain the current value."))
+    def _detect_file_encoding(self, filename):
+        """
+        Returns the first supported encoding that decodes a sample from the start and one from the end
+        of the uncompressed file.
 
-        new_headers = []
-        for i, header in enumerate(self.headers):
-            new_value = input(self._("Column %(num)s (current: '%(current)s'): ") % {'num': i + 1, 'current': header}).strip()
-            if new_value == '':
-                new_headers.append(header)
-            else:
-                new_headers.append(new_value)
+        New rows are written at the end, so the end is checked as well as the headers, without reading
+        the whole file.
 
-        self.headers = new_headers
-        self.show_message(self._("Column headers have been updated."), 'info')
+        Raises:
+            OSError: If the file cannot be read
+            UnicodeDecodeError: If no supported encoding can decode the samples
+        """
+        with open(filename, 'rb') as f:
+            head = f.read(self.encoding_sample_size)
+            f.seek(max(len(head), os.fstat(f.fileno()).st_size - self.encoding_sample_size))
+            tail = f.read()
+
+        # The samples may cut a character: the head is decoded as the start of a stream,
+        # and UTF-8 continuation bytes at the start of the tail are skipped
+        tail_start = 0
+        while tail_start < min(3, len(tail)) and 0x80 <= tail[tail_start] < 0xc0:
+            tail_start += 1
+
+        for encoding in ['utf-8'] + self.fallback_encodings:
+            try:
+                codecs.getincrementaldecoder(encoding)().decode(head)
+                tail[tail_start if encoding == 'utf-8' else 0:].decode(encoding)
+                return encoding
+            except UnicodeDecodeError:
+                continue
 
-    def _edit_or_add_row(self, row_index):
-        """Edits an existing row or adds a new one."""
-        original_row_count = len(self.data)
+        raise UnicodeDecodeError("All encodings failed", b"", 0, 1, "Cannot decode file")
 
-        if row_index >= original_row_count:
-            if row_index > original_row_count:
-                # No status message, will be displayed below the table
-                print(self._("Row index %(index)s is higher than the maximum number of rows (%(maxrows)s).") % {'index': row_index + 1, 'maxrows': original_row_count})
-                fill_gap = input(self._("Should the gap be filled with %(rows)s empty rows?") % {'rows': row_index - original_row_count} + " (y/n): ").strip().lower()
-                if fill_gap == 'y':
-                    for _ in range(row_index - original_row_count):
-                        self.data.append([''] * len(self.headers))
-                    self.show_message(
-                        self._("Added %(rows)s empty rows.") % {'rows': row_index - original_row_count}, 
-                        'info'
-                    )
+    def _append_rows_to_file(self, rows):
+        """Appends rows to the end of the uncompressed file on disk."""
+        with open(self.filename, 'rb') as f:
+            f.seek(-1, os.SEEK_END)
+            needs_line_break = f.read(1) not in b'\r\n'
+
+        with self._open_csv_file(self.filename, 'a', encoding=self.encoding, compression=None) as csvfile:
+            if needs_line_break:
+                csvfile.write('\r\n')
+            writer = csv.writer(csvfile, delimiter=self.delimiter)
+            writer.writerows(rows)
+
+    def _save_projected_csv(self):
+        """
+        Saves a table loaded with a column selection.
+
+        The columns that were not loaded are merged back from the original file, which is
+        streamed alongside the table as long as the rows keep their original order.
+        """
+        projection = self.column_projection
+        source_width = len(self.source_headers)
+        merged_headers = list(self.source_headers)
+        for column, source_index in enumerate(projection):
+            merged_headers[source_index] = self.headers[column]
+        # Columns added in this session are appended after the source columns
+        added_width = len(self.headers) - len(projection)
+        merged_headers.extend(self.headers[len(projection):])
+
+        origins = [origin for origin in self.row_origins if origin >= 0]
+        in_order = all(a < b for a, b in zip(origins, origins[1:]))
+
+        compression = self._detect_compression(self.filename)
+        temp_filename = f"{self.filename}.sivvy-tmp"
+        try:
+            with self._open_csv_file(self.filename, encoding=self.encoding) as source_file, \
+                    self._open_csv_file(temp_filename, 'w', compression=compression) as target_file:
+                source_reader = csv.reader(source_file, delimiter=self.delimiter)
+                next(source_reader, None)
+
+                if in_order:
+                    source_rows = None
                 else:
-                    row_index = original_row_count
+                    # Restored rows changed the order, so only the rows still needed are kept in memory
+                    needed = set(origins)
+                    source_rows = {i: row for i, row in enumerate(source_reader) if i in needed}
+
+                writer = csv.writer(target_file, delimiter=self.delimiter)
+                writer.writerow(merged_headers)
+
+                source_position = -1
+                source_row = []
+                for row, origin in zip(self.data, self.row_origins):
+                    if origin < 0:
+                        merged_row = [''] * source_width
+                    else:
+                        if source_rows is not None:
+                            source_row = source_rows.get(origin, [])
+                        else:
+                            while source_position < origin:
+                                source_row = next(source_reader, [])
+                                source_position += 1
+                        merged_row = source_row + [''] * (source_width - len(source_row))
+
+                    for column, source_index in enumerate(projection):
+                        merged_row[source_index] = row[column] if column < len(row) else ''
+                    if added_width:
+                        added_values = row[len(projection):len(projection) + added_width]
+                        merged_row = merged_row[:source_width] + added_values + [''] * (added_width - len(added_values))
+                    writer.writerow(merged_row)
+
+            os.replace(temp_filename, self.filename)
+            # Rows of the file now match the rows of the table, columns added in this session are part of it
+            self.source_headers = merged_headers
+            self.column_projection = projection + list(range(source_width, source_width + added_width))
+            self.row_origins = array('q', range(len(self.data)))
+            if added_width:
+                # The added columns are now part of the file and can no longer be removed by undo
+                self.undo_history = [entry for entry in self.undo_history if entry['type'] != 'columns']
+        finally:
+            if os.path.exists(temp_filename):
+                os.remove(temp_filename)
+
+    def _insert_row(self, row_index, row, origin=-1):
+        """
+        Inserts a row at the given position and keeps the query mirror in sync.
 
-            new_row = [''] * len(self.headers)
-            self.data.append(new_row)
-            self.show_message(self._("Adding new row %(index)s.") % {'index': row_index + 1}, 'info')
+        Args:
+            row_index (int): Zero-based position of the new row
+            row (list): The row values
+            origin (int): Source row in the file if only some columns are loaded, -1 for new rows
+        """
+        with self.load_lock:
+            self.data.insert(row_index, row)
+            if self.column_projection is not None:
+                self.row_origins.insert(row_index, origin)
+        self._schema_add_rows([row])
+        self._rows_changed('insert', row_index)
+
+    def _replace_row(self, row_index, row):
+        """Replaces the row at the given position and keeps the query mirror in sync."""
+        self._schema_remove_rows([self.data[row_index]])
+        self.data[row_index] = row
+        self._schema_add_rows([row])
+        self._rows_changed('update', row_index)
+
+    def _remove_row(self, row_index):
+        """Removes and returns the row at the given position, keeping the query mirror in sync."""
+        with self.load_lock:
+            row = self.data.pop(row_index)
+            if self.column_projection is not None:
+                self.row_origins.pop(row_index)
+        self._schema_remove_rows([row])
+        self._rows_changed('delete', row_index)
+        return row
+
+    def _set_cells(self, cells):
+        """
+        Changes many cells of rows in the table in place.
 
-        row_to_edit = self.data[row_index] 
+        Args:
+            cells (list): (row, column, value) tuples
+        """
+        changed_rows = list({id(row): row for row, column, value in cells}.values())
+        self._schema_remove_rows(changed_rows)
+        for row, column, value in cells:
+            row[column] = value
+        self._schema_add_rows(changed_rows)
+
+        # Cells hold stored positions, types are kept for the columns of the headers
+        columns = {self._stored_column(column): column for column in range(len(self.headers))}
+        positions = {id(row): i for i, row in enumerate(self.data)} if self.typed_columns is not None else {}
+        self._typed_cells_changed(
+            [(positions.get(id(row)), row, columns[position]) for row, position, value in cells if position in columns]
+        )
+        self._table_changed()
 
-        print("\n--- " + self._("Editing row %(index)s") % {'index': row_index + 1} + " ---")
-        print(self._("Enter new values. Leave empty to retain the current value."))
+    def _rows_changed(self, action, row_index):
+        """
+        Propagates a single row change to derived structures.
 
-        edited_row = []
-        for i, header in enumerate(self.headers):
-            current_value = row_to_edit[i] if i < len(row_to_edit) else ''
-            new_value = input(self._("%(header)s (current: '%(current)s'): ") % {'header': header, 'current': current_value}).strip()
-            if new_value == '':
-                edited_row.append(current_value)
+        Args:
+            action (str): 'insert', 'update' or 'delete'
+            row_index (int): Zero-based position of the affected row
+        """
+        self.table_modified = True
+        if self.key_index is not None:
+            self._sync_key_index(action, row_index)
+        if self.sql_connection is not None:
+            self._sync_sql_mirror(action, row_index)
+        self._sync_typed_columns(action, row_index)
+
+    def _key_value(self, row):
+        """Returns the key of a row."""
+        return self._cell(row, self.key_column).strip()
+
+    def _build_key_index(self):
+        """Builds the index from key values to the position of their first row."""
+        self._wait_for_loading()
+        key_index = {}
+        duplicate_keys = Counter()
+        for i, row in enumerate(self.data):
+            key = self._key_value(row)
+            if not key:
+                continue
+            if key in key_index:
+                duplicate_keys[key] += 1
             else:
-                edited_row.append(new_value)
+                key_index[key] = i
+        self.key_index = key_index
+        self.duplicate_keys = duplicate_keys
 
-        self.data[row_index] = edited_row 
+    def _sync_key_index(self, action, row_index):
+        """
+        Applies a single row change to the key index.
 
-        self.show_message(self._("Row %(index)s has been updated.") % {'index': row_index + 1}, 'info')
+        Rows added at the end and edited rows are indexed directly. Other inserts and deletes shift
+        the following rows, so the index is rebuilt on the next lookup instead.
+        """
+        if action == 'delete' or (action == 'insert' and row_index != len(self.data) - 1):
+            self.key_index = None
+            return
 
-    def _delete_row(self, row_index):
-        """Deletes a row with confirmation"""
-        if row_index < 0 or row_index >= len(self.data):
+        key = self._key_value(self.data[row_index])
+        position = self.key_index.get(key)
+        if not key or position == row_index:
+            return
+        if position is not None and position < len(self.data) and self._key_value(self.data[position]) == key:
+            self.duplicate_keys[key] += 1
+            if row_index < position:
+                self.key_index[key] = row_index
+        else:
+            self.key_index[key] = row_index
+
+    def _find_key(self, key):
+        """
+        Finds the row with a key.
+
+        Entries of the index are checked against the row they point to, an outdated index is rebuilt.
+
+        Returns:
+            int: Zero-based row position, or None if no row has the key
+        """
+        if self.key_index is None:
+            self._build_key_index()
+        position = self.key_index.get(key)
+        if position is not None and (position >= len(self.data) or self._key_value(self.data[position]) != key):
+            self._build_key_index()
+            position = self.key_index.get(key)
+        return position
+
+    def _add_undo_entry(self, entry):
+        """
+        Adds an entry to the undo history.
+
+        Args:
+            entry (dict): 'type' is 'row' for a single deleted row with 'index', 'data' and 'origin',
+                'rows' for a batch of deleted rows with 'description' and 'rows' as (index, data, origin) tuples,
+                'cells' for a batch of changed cells with 'description' and 'cells' as (row, column, old value) tuples,
+                'inserted' for a batch of inserted rows with 'description' and the inserted 'rows',
+                or 'columns' for a column change with 'description' and the previous 'headers', 'column_map',
+                'column_defaults' and 'stored_width'
+        """
+        entry['timestamp'] = self._get_current_time()
+        self.undo_history.append(entry)
+
+        if len(self.undo_history) > self.max_undo_history:
+            self.undo_history.pop(0)
+
+    def _undo_batch(self, entry):
+        """Reverts a batch operation from the undo history."""
+        if entry['type'] == 'rows':
+            self._restore_rows(entry['rows'])
+        elif entry['type'] == 'cells':
+            # Rows are referenced directly, so changes stay correct after rows were moved
+            table_rows = {id(row) for row in self.data}
+            for row, column, value in entry['cells']:
+                if id(row) not in table_rows:
+                    row[column] = value
+            self._set_cells([cell for cell in entry['cells'] if id(cell[0]) in table_rows])
+        elif entry['type'] == 'inserted':
+            inserted_rows = {id(row) for row in entry['rows']}
+            self._remove_rows({i for i, row in enumerate(self.data) if id(row) in inserted_rows})
+        elif entry['type'] == 'columns':
+            self._set_column_layout(entry['headers'], entry['column_map'], entry['column_defaults'], entry['stored_width'])
+
+    def _remove_rows(self, row_indexes):
+        """
+        Removes many rows in one pass.
+
+        Args:
+            row_indexes (set): Zero-based positions of the rows to remove
+
+        Returns:
+            list: (index, data, origin) tuples of the removed rows, for undo
+        """
+        self._wait_for_loading()
+        removed_rows = []
+        kept_rows = []
+        kept_origins = array('q')
+        track_origins = self.column_projection is not None
+
+        for i, row in enumerate(self.data):
+            origin = self.row_origins[i] if track_origins else -1
+            if i in row_indexes:
+                removed_rows.append((i, row, origin))
+            else:
+                kept_rows.append(row)
+                if track_origins:
+                    kept_origins.append(origin)
+
+        self.data = kept_rows
+        if track_origins:
+            self.row_origins = kept_origins
+        self._schema_remove_rows([row for i, row, origin in removed_rows])
+        self._typed_rows_removed([i for i, row, origin in removed_rows])
+        self._table_changed()
+        return removed_rows
+
+    def _restore_rows(self, removed_rows):
+        """Reinserts rows removed by _remove_rows at their original positions in one pass."""
+        self._wait_for_loading()
+        restored_data = []
+        restored_origins = array('q')
+        track_origins = self.column_projection is not None
+        restored_positions = []
+        remaining = iter(enumerate(self.data))
+        pending = iter(removed_rows)
+        next_removed = next(pending, None)
+
+        while True:
+            if next_removed is not None and next_removed[0] <= len(restored_data):
+                restored_positions.append(len(restored_data))
+                restored_data.append(next_removed[1])
+                if track_origins:
+                    restored_origins.append(next_removed[2])
+                next_removed = next(pending, None)
+                continue
+            current = next(remaining, None)
+            if current is None:
+                break
+            restored_data.append(current[1])
+            if track_origins:
+                restored_origins.append(self.row_origins[current[0]])
+
+        # Rows beyond the current end of the table are appended
+        while next_removed is not None:
+            restored_positions.append(len(restored_data))
+            restored_data.append(next_removed[1])
+            if track_origins:
+                restored_origins.append(next_removed[2])
+            next_removed = next(pending, None)
+
+        self.data = restored_data
+        if track_origins:
+            self.row_origins = restored_origins
+        self._schema_add_rows([row for i, row, origin in removed_rows])
+        self._typed_rows_inserted(restored_positions)
+        self._table_changed()
+
+    def _table_changed(self):
+        """
+        Discards the key index and query mirror after bulk changes, they are rebuilt on next use.
+
+        Column types and typed columns are updated by the changes themselves.
+        """
+        self.table_modified = True
+        self.key_index = None
+        self._reset_sql_mirror()
+
+    def _stored_column(self, column):
+        """Returns the position of a column in the stored rows."""
+        return column if self.column_map is None else self.column_map[column]
+
+    def _cell(self, row, column):
+        """Returns the value of a column in a stored row, '' or the column default if the row is shorter."""
+        return self._stored_cell(row, self._stored_column(column))
+
+    def _stored_cell(self, row, position):
+        """
+        Returns the cell at a stored position, or the column default if the row is shorter.
+
+        Defaults are a value for inserted columns, or computed from other cells of the row for split
+        columns ('split', source position, separator, part, part count) and merged columns
+        ('merge', source positions, separator). Rows only get the cell when it is set.
+        """
+        if position < len(row):
+            return row[position]
+        default = self.column_defaults.get(position, '')
+        if isinstance(default, str):
+            return default
+        if default[0] == 'split':
+            kind, source, separator, part, part_count = default
+            parts = self._stored_cell(row, source).split(separator, part_count - 1)
+            return parts[part] if part < len(parts) else ''
+        kind, sources, separator = default
+        return separator.join(value for value in (self._stored_cell(row, source) for source in sources) if value)
+
+    def _logical_row(self, row):
+        """Returns the values of a stored row in the order of the headers."""
+        if self.column_map is None:
+            return row
+        if len(row) >= self.stored_width:
+            return [row[position] for position in self.column_map]
+        return [self._stored_cell(row, position) for position in self.column_map]
+
+    def _logical_rows(self, rows):
+        """Returns an iterable of rows in the order of the headers."""
+        return rows if self.column_map is None else map(self._logical_row, rows)
+
+    def _stored_row(self, values, row=None):
+        """
+        Returns a row to store from values in the order of the headers.
+
+        Args:
+            values (list): Values in the order of the headers
+            row (list): Stored row the values replace, its cells of removed columns are kept
+        """
+        if self.column_map is None:
+            return values
+        stored_row = [self._stored_cell(row or [], position) for position in range(self.stored_width)]
+        for position, value in zip(self.column_map, values):
+            stored_row[position] = value
+        return stored_row
+
+    def _stored_rows(self):
+        """Yields each row of the table and of the undo history once, to change the layout of all rows."""
+        yield from self.data
+        table_rows = None
+        for entry in self.undo_history:
+            if entry['type'] == 'row':
+                rows = [entry['data']]
+            elif entry['type'] == 'rows':
+                rows = [row for i, row, origin in entry['rows']]
+            elif entry['type'] == 'inserted':
+                rows = entry['rows']
+            elif entry['type'] == 'cells':
+                rows = [row for row, column, value in entry['cells']]
+            else:
+                continue
+            if table_rows is None:
+                table_rows = {id(row) for row in self.data}
+            for row in rows:
+                if id(row) not in table_rows:
+                    table_rows.add(id(row))
+                    yield row
+
+    def _prepare_column_change(self):
+        """
+        Starts an operation that changes the column layout, with a column map if there is none yet.
+
+        Returns:
+            list: Copy of the column map to change
+
+        Raises:
+            ValueError: If only some columns of the file are loaded
+        """
+        self._wait_for_loading()
+        if self.column_projection is not None:
+            raise ValueError(self._("Columns cannot be changed while only some columns are loaded."))
+        if self.column_map is None:
+            self.stored_width = max(len(self.headers), max(map(len, self._stored_rows()), default=0))
+            self.column_map = list(range(len(self.headers)))
+        return list(self.column_map)
+
+    def _change_column_layout(self, description, headers, column_map, column_defaults, stored_width=None):
+        """
+        Changes the columns as a single operation that can be undone, returns the description.
+
+        Args:
+            stored_width (int): Number of stored positions after the change, None if it does not change
+        """
+        self._add_undo_entry({
+            'type': 'columns',
+            'description': description,
+            'headers': list(self.headers),
+            'column_map': self.column_map,
+            'column_defaults': self.column_defaults,
+            'stored_width': self.stored_width if self.column_map is not None else None
+        })
+        self._set_column_layout(headers, column_map, column_defaults, stored_width)
+        return description
+
+    def _set_column_layout(self, headers, column_map, column_defaults, stored_width=None):
+        """
+        Sets headers and column map. Rows keep their stored layout until the map is applied,
+        the table is written in the new layout when saving.
+
+        Args:
+            stored_width (int): Number of stored positions, None to keep it. Cells beyond a smaller
+                width, which were set in columns added since, are removed from the rows.
+        """
+        if column_map is None and self.column_map is not None:
+            # Rows matched these headers before the map was started, so their cells have not moved
+            column_map = list(range(len(headers)))
+        if self.key_column is not None:
+            position = self._stored_column(self.key_column)
+            positions = range(len(headers)) if column_map is None else column_map
+            self.key_column = positions.index(position) if position in positions else None
+        old_columns = {self._stored_column(column): column for column in range(len(self.headers))}
+
+        self.headers = headers
+        self.column_map = column_map
+        self.column_defaults = column_defaults
+        if stored_width is not None:
+            if stored_width < self.stored_width:
+                self._truncate_stored_rows(stored_width)
+            self.stored_width = stored_width
+        self._move_column_types(old_columns)
+        self._table_changed()
+        if self.validator is not None:
+            # Schema rules name the columns, so the logical rows are checked again right away
+            self._load_schema()
+            self._check_table_schema()
+            self._show_schema_summary()
+
+    def _truncate_stored_rows(self, stored_width):
+        """Removes the cells beyond a number of stored positions from all rows and from the undo history."""
+        for row in self._stored_rows():
+            if len(row) > stored_width:
+                del row[stored_width:]
+        for entry in self.undo_history:
+            if entry['type'] == 'cells':
+                entry['cells'] = [cell for cell in entry['cells'] if cell[1] < stored_width]
+
+    def _apply_column_map(self):
+        """
+        Lays out all rows in the order of the headers, once before operations that change many rows.
+
+        Rows and changed cells of the undo history are laid out as well. Column changes that need
+        the cells of removed columns can no longer be undone.
+        """
+        column_map = self.column_map
+        if column_map is None:
+            return
+
+        for row in self._stored_rows():
+            row[:] = self._logical_row(row)
+
+        columns = {position: column for column, position in enumerate(column_map)}
+        undo_history = []
+        for entry in self.undo_history:
+            if entry['type'] == 'cells':
+                entry['cells'] = [(row, columns[position], value) for row, position, value in entry['cells'] if position in columns]
+            elif entry['type'] == 'columns':
+                entry_map = entry['column_map'] if entry['column_map'] is not None else range(len(entry['headers']))
+                if not all(position in columns for position in entry_map):
+                    continue
+                entry['column_map'] = [columns[position] for position in entry_map]
+                # All rows have the cells now, computed defaults only apply to new rows, which start empty
+                entry['column_defaults'] = {
+                    columns[position]: value if isinstance(value, str) else ''
+                    for position, value in entry['column_defaults'].items() if position in columns
+                }
+                entry['stored_width'] = len(self.headers)
+            undo_history.append(entry)
+
+        if len(undo_history) < len(self.undo_history):
             self.show_message(
-                self._("Invalid row index %(index)s. Valid range: 1-%(max)s") % {
-                    'index': row_index + 1, 
-                    'max': len(self.data)
-                }, 
+                self._("%(count)s column changes can no longer be undone.") % {
+                    'count': len(self.undo_history) - len(undo_history)
+                },
+                'warning'
+            )
+        self.undo_history = undo_history
+        self.column_map = None
+        self.column_defaults = {}
+        self.stored_width = len(self.headers)
+
+    def _map_appended_rows(self, source_headers, rows, add_rows):
+        """
+        Maps the rows of another file to the table columns by header name and adds them in batches.
+
+        Rows with a different number of cells than the other file has headers are skipped.
+
+        Args:
+            source_headers (list): Headers of the other file
+            rows (iterator): Data rows of the other file
+            add_rows (callable): Called with each batch of mapped rows
+
+        Returns:
+            tuple: (appended rows, skipped rows, first skipped row numbers, ignored column names)
+
+        Raises:
+            ValueError: If no column of the other file matches a table column
+        """
+        if not source_headers:
+            return 0, 0, [], []
+
+        source_names = [header.strip().lower() for header in source_headers]
+        mapping = [source_names.index(name) if name in source_names else -1
+                   for name in (header.strip().lower() for header in self.headers)]
+        if all(source_index < 0 for source_index in mapping):
+            raise ValueError(self._("None of the columns match the columns of the table."))
+        ignored_columns = [header for i, header in enumerate(source_headers) if i not in mapping]
+        width = len(source_headers)
+        same_columns = mapping == list(range(width))
+
+        appended_count = 0
+        skipped_count = 0
+        skipped_rows = []
+        batch = []
+        for row_number, row in enumerate(rows, 1):
+            if len(row) != width:
+                if row:  # Empty lines are ignored silently
+                    skipped_count += 1
+                    if len(skipped_rows) < 5:
+                        skipped_rows.append(row_number)
+                continue
+
+            batch.append(row if same_columns else [row[i] if i >= 0 else '' for i in mapping])
+            if len(batch) >= self.load_batch_size:
+                add_rows(batch)
+                appended_count += len(batch)
+                batch = []
+
+        if batch:
+            add_rows(batch)
+            appended_count += len(batch)
+        return appended_count, skipped_count, skipped_rows, ignored_columns
+
+    def _extend_rows(self, rows):
+        """Appends new rows at the end of the table."""
+        row_count = len(self.data)
+        with self.load_lock:
+            self.data.extend(rows)
+            if self.column_projection is not None:
+                self.row_origins.extend([-1] * len(rows))
+        self.key_index = None
+        self._schema_add_rows(rows)
+        if row_count:
+            self._typed_rows_inserted(range(row_count, len(self.data)))
+        else:
+            # An empty table has no types yet
+            self._infer_column_types()
+
+    def _truncate_rows(self, row_count):
+        """Removes all rows after the given number of rows."""
+        self._schema_remove_rows(self.data[row_count:])
+        with self.load_lock:
+            del self.data[row_count:]
+            if self.column_projection is not None:
+                del self.row_origins[row_count:]
+        for values, mask in (self.typed_columns or {}).values():
+            del values[row_count:]
+            del mask[row_count:]
+
+    def _row_fingerprint_function(self, column_indexes, normalize):
+        """
+        Returns a function computing a fixed-size fingerprint of the given columns of a row.
+
+        Args:
+            column_indexes (list): Zero-based columns to compare
+            normalize (bool): Ignore case and differences in whitespace
+        """
+        def fingerprint(row):
+            values = [row[i] if i < len(row) else '' for i in column_indexes]
+            if normalize:
+                values = [' '.join(value.split()).casefold() for value in values]
+            return hashlib.blake2b(repr(values).encode('utf-8', 'surrogatepass'), digest_size=16).digest()
+        return fingerprint
+
+    def _resolve_column_list(self, headers, columns):
+        """
+        Resolves a list of column names or numbers.
+
+        Returns:
+            list: Zero-based column indexes, all columns if no columns are given
+
+        Raises:
+            ValueError: If a column does not exist
+        """
+        if not columns:
+            return list(range(len(headers)))
+
+        column_indexes = []
+        for column in columns:
+            column_index = self._resolve_column(headers, column)
+            if column_index is None:
+                raise ValueError(self._("Column '%(column)s' not found.") % {'column': column.strip()})
+            column_indexes.append(column_index)
+        return column_indexes
+
+    def _dedup_rows_in_memory(self, headers, rows, delimiter, output_filename, columns, normalize):
+        """
+        Streams rows to the output file, skipping rows with a fingerprint seen before.
+
+        Returns:
+            tuple: (rows read, duplicates removed), or None if there are too many distinct rows
+        """
+        fingerprint = self._row_fingerprint_function(self._resolve_column_list(headers, columns), normalize)
+        seen = set()
+        row_count = 0
+        duplicate_count = 0
+
+        with self._open_csv_file(output_filename, 'w') as output_file:
+            writer = csv.writer(output_file, delimiter=delimiter)
+            writer.writerow(headers)
+            for row in rows:
+                row_count += 1
+                row_fingerprint = fingerprint(row)
+                if row_fingerprint in seen:
+                    duplicate_count += 1
+                    continue
+                if len(seen) >= self.dedup_memory_limit:
+                    return None
+                seen.add(row_fingerprint)
+                writer.writerow(row)
+
+        return row_count, duplicate_count
+
+    def _write_sorted_run(self, directory, records):
+        """Sorts fixed-size binary records and writes them to a temporary run file."""
+        records.sort()
+        with tempfile.NamedTemporaryFile('wb', dir=directory, delete=False) as run_file:
+            run_file.write(b''.join(records))
+            return run_file.name
+
+    def _read_records(self, filename, record_size):
+        """Reads fixed-size binary records from a run file."""
+        with open(filename, 'rb') as run_file:
+            while True:
+                block = run_file.read(record_size * 65536)
+                if not block:
+                    return
+                for offset in range(0, len(block), record_size):
+                    yield block[offset:offset + record_size]
+
+    def _dedup_rows_external(self, headers, rows, delimiter, encoding, input_filename, output_filename, columns, normalize):
+        """
+        Removes duplicates with an external sort of (fingerprint, row number) records.
+
+        Pass 1 writes sorted runs of records, merging the runs yields the row numbers of all
+        duplicates, which are sorted the same way. Pass 2 streams the input again and skips them.
+
+        Returns:
+            tuple: (rows read, duplicates removed)
+        """
+        fingerprint = self._row_fingerprint_function(self._resolve_column_list(headers, columns), normalize)
+
+        with tempfile.TemporaryDirectory(prefix='sivvy-') as directory:
+            # Pass 1: 16 byte fingerprint + 8 byte row number, big-endian so byte order equals numeric order
+            fingerprint_runs = []
+            records = []
+            row_count = 0
+            for row_count, row in enumerate(rows, 1):
+                records.append(fingerprint(row) + (row_count - 1).to_bytes(8, 'big'))
+                if len(records) >= self.dedup_memory_limit:
+                    fingerprint_runs.append(self._write_sorted_run(directory, records))
+                    records = []
+            if records:
+                fingerprint_runs.append(self._write_sorted_run(directory, records))
+
+            duplicate_runs = []
+            duplicates = []
+            duplicate_count = 0
+            previous_fingerprint = None
+            for record in heapq.merge(*[self._read_records(run, 24) for run in fingerprint_runs]):
+                if record[:16] == previous_fingerprint:
+                    duplicates.append(record[16:])
+                    duplicate_count += 1
+                    if len(duplicates) >= self.dedup_memory_limit:
+                        duplicate_runs.append(self._write_sorted_run(directory, duplicates))
+                        duplicates = []
+                previous_fingerprint = record[:16]
+            if duplicates:
+                duplicate_runs.append(self._write_sorted_run(directory, duplicates))
+
+            # Pass 2
+            duplicate_rows = (int.from_bytes(record, 'big') for record in heapq.merge(*[self._read_records(run, 8) for run in duplicate_runs]))
+            next_duplicate = next(duplicate_rows, None)
+            with self._open_csv_file(input_filename, encoding=encoding) as input_file, \
+                    self._open_csv_file(output_filename, 'w') as output_file:
+                reader = csv.reader(input_file, delimiter=delimiter)
+                writer = csv.writer(output_file, delimiter=delimiter)
+                writer.writerow(next(reader, headers))
+                for i, row in enumerate(reader):
+                    if i == next_duplicate:
+                        next_duplicate = next(duplicate_rows, None)
+                        continue
+                    writer.writerow(row)
+
+        return row_count, duplicate_count
+
+    def _load_schema(self):
+        """Loads the schema given on the command line or the sidecar schema of the file, if there is one."""
+        self.validator = None
+        self.schema_columns = {}
+        schema_filename = self.schema_filename or f"{self.filename}.schema.json"
+        if not os.path.exists(schema_filename):
+            if self.schema_filename:
+                self.show_message(self._("Schema file '%(file)s' not found.") % {'file': schema_filename}, 'warning')
+            return
+
+        try:
+            with open(schema_filename, encoding='utf-8') as f:
+                schema = json.load(f)
+            columns = {}
+            for column, rule in schema.get('columns', {}).items():
+                column_index = self._resolve_column(self.headers, column)
+                if column_index is None:
+                    self.show_message(self._("Schema column '%(column)s' not found in the table.") % {'column': column}, 'warning')
+                    continue
+                columns[column_index] = rule
+            self.validator = SchemaValidator(columns, self.headers, self._)
+        except (OSError, ValueError, AttributeError, re.error) as e:
+            self.show_message(
+                self._("Cannot use schema '%(file)s': %(error)s") % {'file': schema_filename, 'error': e},
+                'error'
+            )
+            return
+
+        self.schema_columns = {column: self.headers[column] for column in columns}
+        self.show_message(self._("Checking rows with schema '%(file)s'.") % {'file': schema_filename}, 'info')
+
+    def _schema_add_rows(self, rows):
+        """Checks rows that were added to the table or changed."""
+        if self.validator is not None:
+            with self.load_lock:
+                for row in rows:
+                    self.validator.add_row(row, self._logical_row(row))
+
+    def _schema_remove_rows(self, rows):
+        """Forgets rows that are removed from the table or about to change."""
+        if self.validator is not None:
+            with self.load_lock:
+                for row in rows:
+                    self.validator.remove_row(row, self._logical_row(row))
+
+    def _check_table_schema(self):
+        """Checks the whole table again, needed after columns were added."""
+        if self.validator is not None:
+            self.validator.reset(len(self.headers))
+            self._schema_add_rows(self.data)
+
+    def _show_schema_summary(self):
+        """Adds the result of the schema check to the status messages."""
+        if self.validator is None:
+            return
+
+        for message in self.validator.check_headers(self.headers, self.schema_columns):
+            self.show_message(message, 'warning')
+        if self.validator.problems or self.validator.duplicate_count:
+            self.show_message(
+                self._("Schema check: %(rows)s rows break a rule, %(duplicates)s duplicate values. Enter 'schema' for details.") % {
+                    'rows': len(self.validator.problems),
+                    'duplicates': self.validator.duplicate_count
+                },
                 'warning'
             )
+        else:
+            self.show_message(self._("Schema check: all rows are valid."), 'info')
+
+    def _column_type(self, column):
+        """Returns the inferred type of a column, 'text' for columns without a type."""
+        return self.column_types[column] if column < len(self.column_types) else 'text'
+
+    def _infer_column_types(self):
+        """
+        Classifies each column as int, float, date or text from a sample of the first rows.
+
+        The classification is confirmed against all rows when the typed columns are built.
+        """
+        sample = list(self._logical_rows(self.data[:self.type_sample_size]))
+        self.column_types = []
+        self.column_date_formats = {}
+        self.typed_columns = None
+
+        for column in range(len(self.headers)):
+            column_type, date_format = self._infer_column_type(column, sample)
+            self.column_types.append(column_type)
+            if date_format is not None:
+                self.column_date_formats[column] = date_format
+
+    def _classify_columns(self, columns):
+        """Classifies the given columns again from a sample of the first rows, rebuilding built typed columns."""
+        if not columns:
+            return
+        sample = list(self._logical_rows(self.data[:self.type_sample_size]))
+        for column in columns:
+            column_type, date_format = self._infer_column_type(column, sample)
+            self.column_types[column] = column_type
+            self.column_date_formats.pop(column, None)
+            if date_format is not None:
+                self.column_date_formats[column] = date_format
+            if self.typed_columns is not None:
+                self.typed_columns.pop(column, None)
+                self._build_typed_column(column)
+
+    def _infer_column_type(self, column, sample):
+        """
+        Classifies a column from sample rows in the order of the headers.
+
+        Returns:
+            tuple: (column type, date format or None)
+        """
+        values = [row[column].strip() for row in sample if column < len(row) and row[column].strip()]
+        if not values:
+            return 'text', None
+        if all(self.int_pattern.fullmatch(value) for value in values):
+            return 'int', None
+        if all(self.float_pattern.fullmatch(value) for value in values):
+            return 'float', None
+        date_format = self._detect_date_format(values)
+        return ('text', None) if date_format is None else ('date', date_format)
+
+    def _move_column_types(self, old_columns):
+        """
+        Keeps types and typed columns of the columns that remain after a column change, new columns are classified.
+
+        Args:
+            old_columns (dict): Stored position -> column index before the change
+        """
+        column_types = []
+        column_date_formats = {}
+        typed_columns = {} if self.typed_columns is not None else None
+        new_columns = []
+        sample = None
+        for column in range(len(self.headers)):
+            old_column = old_columns.get(self._stored_column(column))
+            if old_column is None or old_column >= len(self.column_types):
+                if sample is None:
+                    sample = list(self._logical_rows(self.data[:self.type_sample_size]))
+                column_type, date_format = self._infer_column_type(column, sample)
+                new_columns.append(column)
+            else:
+                column_type = self.column_types[old_column]
+                date_format = self.column_date_formats.get(old_column)
+                if typed_columns is not None and old_column in self.typed_columns:
+                    typed_columns[column] = self.typed_columns[old_column]
+            column_types.append(column_type)
+            if date_format is not None:
+                column_date_formats[column] = date_format
+
+        self.column_types = column_types
+        self.column_date_formats = column_date_formats
+        self.typed_columns = typed_columns
+        if typed_columns is not None:
+            for column in new_columns:
+                self._build_typed_column(column)
+
+    def _detect_date_format(self, values):
+        """Returns the first supported date format matching all values, or None."""
+        for date_format in self.date_formats:
+            try:
+                for value in values:
+                    datetime.strptime(value, date_format)
+                return date_format
+            except ValueError:
+                continue
+        return None
+
+    def _typed_value(self, column, value):
+        """
+        Converts a cell to the storage value of its typed column.
+
+        Returns:
+            tuple: (value, is_valid), is_valid is 0 for empty cells
+
+        Raises:
+            ValueError: If the cell does not match the column type
+        """
+        value = value.strip()
+        if not value:
+            return 0, 0
+
+        column_type = self.column_types[column]
+        if column_type == 'int':
+            if not self.int_pattern.fullmatch(value):
+                raise ValueError(value)
+            return int(value), 1
+        if column_type == 'float':
+            if not self.float_pattern.fullmatch(value):
+                raise ValueError(value)
+            return float(value), 1
+
+        # Parsed like in _detect_date_format, so inferred dates always fit their column
+        return datetime.strptime(value, self.column_date_formats[column]).toordinal(), 1
+
+    def _value_fits_column_type(self, column, value):
+        """Checks whether a value can be stored in its typed column."""
+        if self._column_type(column) == 'text':
+            return True
+        try:
+            self._typed_value(column, value)
+            return True
+        except (ValueError, OverflowError):
             return False
 
-        row_to_delete = self.data[row_index]
-        print("\n--- " + self._("Deleting row %(index)s") % {'index': row_index + 1} + " ---")
+    def _set_column_type(self, column, column_type):
+        """Changes the type of a column, typed storage is rebuilt or dropped accordingly."""
+        self.column_types[column] = column_type
+        if self.typed_columns is None:
+            return
+        self.typed_columns.pop(column, None)
+        if column_type != 'text':
+            self._build_typed_column(column)
+
+    def _build_typed_column(self, column):
+        """
+        Converts a column into a compact array with a validity mask.
+
+        A column that turns out not to match its type is demoted: int to float, anything else to text.
+        """
+        while self.column_types[column] != 'text':
+            try:
+                self.typed_columns[column] = self._typed_values(column, self.data)
+                return
+            except (ValueError, OverflowError):
+                self.column_types[column] = 'float' if self.column_types[column] == 'int' else 'text'
+                self.column_date_formats.pop(column, None)
+
+    def _typed_values(self, column, rows):
+        """
+        Converts the cells of a typed column in the given rows.
+
+        Returns:
+            tuple: (values array, validity mask)
+
+        Raises:
+            ValueError: If a cell does not match the column type
+        """
+        values = array(self.typecodes[self.column_types[column]])
+        mask = bytearray()
+        for row in rows:
+            value, is_valid = self._typed_value(column, self._cell(row, column))
+            values.append(value)
+            mask.append(is_valid)
+        return values, mask
+
+    def _build_typed_columns(self):
+        """Builds typed storage for all columns with a non-text type."""
+        self._wait_for_loading()
+        self.typed_columns = {}
+        for column in range(len(self.column_types)):
+            self._build_typed_column(column)
+
+    def _sync_typed_columns(self, action, row_index):
+        """Applies a single row change to the column types and typed columns."""
+        if action == 'delete':
+            self._typed_rows_removed([row_index])
+        elif action == 'insert':
+            self._typed_rows_inserted([row_index])
+        else:
+            row = self.data[row_index]
+            self._typed_cells_changed([(row_index, row, column) for column in range(len(self.column_types))])
+
+    def _demote_column_type(self, column, rows=()):
+        """
+        Changes the type of a column whose values no longer fit to a more general type: int to float, others to text.
+
+        A built typed column is rebuilt from all rows, otherwise the type is demoted until the given rows fit.
+        """
+        while self.column_types[column] != 'text':
+            self.column_types[column] = 'float' if self.column_types[column] == 'int' else 'text'
+            self.column_date_formats.pop(column, None)
+            if self.typed_columns is not None:
+                self.typed_columns.pop(column, None)
+                self._build_typed_column(column)
+                return
+            if all(self._value_fits_column_type(column, self._cell(row, column)) for row in rows):
+                return
+
+    def _typed_cells_changed(self, cells):
+        """
+        Applies changed cells to the column types and typed columns.
+
+        Args:
+            cells (list): (row position, row, column) tuples, the position is only needed if typed columns are built
+        """
+        for row_index, row, column in cells:
+            if self._column_type(column) == 'text':
+                continue
+            try:
+                value, is_valid = self._typed_value(column, self._cell(row, column))
+            except (ValueError, OverflowError):
+                self._demote_column_type(column, [row])
+                continue
+            if self.typed_columns is not None and column in self.typed_columns:
+                values, mask = self.typed_columns[column]
+                values[row_index] = value
+                mask[row_index] = is_valid
+
+    def _typed_rows_inserted(self, positions):
+        """Applies rows inserted at the given ascending positions to the column types and typed columns."""
+        rows = [self.data[position] for position in positions]
+        for column in range(len(self.column_types)):
+            if self.column_types[column] == 'text':
+                continue
+            try:
+                new_values, new_mask = self._typed_values(column, rows)
+            except (ValueError, OverflowError):
+                self._demote_column_type(column, rows)
+                continue
+            if self.typed_columns is None or column not in self.typed_columns:
+                continue
+
+            # Merged in slices, the existing values are not converted again
+            values, mask = self.typed_columns[column]
+            merged_values = array(values.typecode)
+            merged_mask = bytearray()
+            start = 0
+            for position, value, is_valid in zip(positions, new_values, new_mask):
+                end = start + position - len(merged_values)
+                merged_values.extend(values[start:end])
+                merged_mask.extend(mask[start:end])
+                merged_values.append(value)
+                merged_mask.append(is_valid)
+                start = end
+            merged_values.extend(values[start:])
+            merged_mask.extend(mask[start:])
+            self.typed_columns[column] = (merged_values, merged_mask)
+
+    def _typed_rows_removed(self, row_indexes):
+        """Removes rows at the given ascending positions from the typed columns."""
+        if not self.typed_columns:
+            return
+        for column, (values, mask) in self.typed_columns.items():
+            kept_values = array(values.typecode)
+            kept_mask = bytearray()
+            start = 0
+            for row_index in row_indexes:
+                kept_values.extend(values[start:row_index])
+                kept_mask.extend(mask[start:row_index])
+                start = row_index + 1
+            kept_values.extend(values[start:])
+            kept_mask.extend(mask[start:])
+            self.typed_columns[column] = (kept_values, kept_mask)
+
+    def _profile_rows(self, headers, rows):
+        """Profiles rows from an iterator in batches, returns a TableProfile."""
+        profile = TableProfile(len(headers))
+        while True:
+            batch = list(islice(rows, self.load_batch_size))
+            if not batch:
+                break
+            profile.add_rows(batch)
+        return profile
+
+    def _sql_column_names(self, headers=None):
+        """Builds unique SQL column names from the table headers or the given headers."""
+        names = []
+        used = {'_row'}
+        for i, header in enumerate(self.headers if headers is None else headers):
+            base = header.strip() or f"column_{i + 1}"
+            name = base
+            suffix = 2
+            # SQLite compares identifiers case-insensitively
+            while name.lower() in used:
+                name = f"{base}_{suffix}"
+                suffix += 1
+            used.add(name.lower())
+            names.append(name)
+        return names
+
+    def _convert_to_jsonl(self, headers, rows, output_filename, compression=None):
+        """Writes each row as a JSON object keyed by column name, returns the number of rows."""
+        names = self._sql_column_names(headers)
+        width = len(names)
+        encode = json.JSONEncoder(ensure_ascii=False).encode
+        row_count = 0
+        with self._open_csv_file(output_filename, 'w', compression=compression) as output_file:
+            write = output_file.write
+            for row_count, row in enumerate(rows, 1):
+                if len(row) != width:
+                    row = row[:width] + [''] * (width - len(row))
+                write(encode(dict(zip(names, row))) + '\n')
+        return row_count
+
+    def _convert_to_tsv(self, headers, rows, output_filename, compression=None):
+        """Writes the rows tab-separated, returns the number of rows."""
+        row_count = 0
+        with self._open_csv_file(output_filename, 'w', compression=compression) as output_file:
+            writer = csv.writer(output_file, delimiter='\t')
+            writer.writerow(headers)
+            while True:
+                batch = list(islice(rows, self.load_batch_size))
+                if not batch:
+                    break
+                writer.writerows(batch)
+                row_count += len(batch)
+        return row_count
+
+    def _convert_to_sqlite(self, headers, rows, output_filename, compression=None, overwrite=False):
+        """
+        Writes the rows to the table 'data' of an SQLite database in one transaction, returns the number of rows.
+
+        An existing table 'data' is only replaced if overwrite is set.
+
+        Raises:
+            ValueError: If the database already has a table 'data' and overwrite is not set
+        """
+        if not headers:
+            raise ValueError(f"'{self.filename}' is empty")
+
+        names = self._sql_column_names(headers)
+        width = len(names)
+        sql_value = self._sql_value
+        number_start = frozenset('0123456789+-.')
+        row_count = 0
+        connection = sqlite3.connect(output_filename)
+        try:
+            # A new transaction is started for each attempt, so a retry with another encoding starts clean.
+            # It is opened explicitly, so that dropping and creating the table are rolled back as well.
+            with connection:
+                connection.execute("BEGIN")
+                if connection.execute("SELECT 1 FROM sqlite_master WHERE name = 'data'").fetchone():
+                    if not overwrite:
+                        raise ValueError(f"'{output_filename}' already contains a table 'data', use --force to replace it")
+                    connection.execute("DROP TABLE data")
+                connection.execute(f"CREATE TABLE data ({', '.join(self._quote_identifier(name) for name in names)})")
+                insert_statement = f"INSERT INTO data VALUES ({', '.join('?' * width)})"
+                while True:
+                    # Only cells that start like a number can become one
+                    batch = [
+                        [sql_value(value) if value[:1] in number_start else value
+                         for value in (row if len(row) == width else row[:width] + [''] * (width - len(row)))]
+                        for row in islice(rows, self.load_batch_size)
+                    ]
+                    if not batch:
+                        break
+                    connection.executemany(insert_statement, batch)
+                    row_count += len(batch)
+        finally:
+            connection.close()
+        return row_count
+
+    def _quote_identifier(self, name):
+        """Quotes an SQL identifier."""
+        return '"' + name.replace('"', '""') + '"'
+
+    def _sql_value(self, value):
+        """Converts a cell to an SQL value. Numbers are only used if their text form survives a round trip."""
+        # The patterns avoid costly exceptions for text cells
+        if self.int_pattern.fullmatch(value):
+            number = int(value)
+            if str(number) == value:
+                return number
+        elif self.float_pattern.fullmatch(value):
+            number = float(value)
+            if repr(number) == value:
+                return number
+        return value
+
+    def _sql_row_values(self, row_index, row):
+        """Returns the mirror record for a row, padded or truncated to the headers."""
+        width = len(self.headers)
+        padded_row = row[:width] + [''] * (width - len(row))
+        return [row_index + 1] + [self._sql_value(value) for value in padded_row]
+
+    def _build_sql_mirror(self):
+        """Bulk-loads the current table into an in-memory SQLite database."""
+        connection = sqlite3.connect(':memory:')
+        self.sql_columns = self._sql_column_names()
+        column_definitions = ', '.join(['"_row" INTEGER'] + [self._quote_identifier(name) for name in self.sql_columns])
+        connection.execute(f"CREATE TABLE main.data ({column_definitions})")
+        connection.execute('CREATE INDEX main.data_row ON data ("_row")')
+
+        placeholders = ', '.join('?' * (len(self.sql_columns) + 1))
+        self.sql_insert_statement = f"INSERT INTO main.data VALUES ({placeholders})"
+        connection.executemany(
+            self.sql_insert_statement,
+            (self._sql_row_values(i, row) for i, row in enumerate(self._logical_rows(self.data)))
+        )
+        connection.commit()
+
+        for statement in self.sql_index_statements:
+            try:
+                connection.execute(statement)
+            except sqlite3.Error as e:
+                self.show_message(
+                    self._("Could not restore index: %(error)s") % {'error': e},
+                    'warning'
+                )
+
+        self.sql_connection = connection
+        self.show_message(
+            self._("Built query table with %(rows)s rows.") % {'rows': len(self.data)},
+            'info'
+        )
+
+    def _reset_sql_mirror(self):
+        """Discards the query mirror, it will be rebuilt with the current headers on next use."""
+        if self.sql_connection is not None:
+            self.sql_connection.close()
+            self.sql_connection = None
+
+    def _sync_sql_mirror(self, action, row_index):
+        """Applies a single row change to the query mirror."""
+        connection = self.sql_connection
+        row_number = row_index + 1
+
+        if action == 'insert':
+            connection.execute('UPDATE main.data SET "_row" = "_row" + 1 WHERE "_row" >= ?', (row_number,))
+            connection.execute(self.sql_insert_statement, self._sql_row_values(row_index, self._logical_row(self.data[row_index])))
+        elif action == 'update':
+            connection.execute('DELETE FROM main.data WHERE "_row" = ?', (row_number,))
+            connection.execute(self.sql_insert_statement, self._sql_row_values(row_index, self._logical_row(self.data[row_index])))
+        elif action == 'delete':
+            connection.execute('DELETE FROM main.data WHERE "_row" = ?', (row_number,))
+            connection.execute('UPDATE main.data SET "_row" = "_row" - 1 WHERE "_row" > ?', (row_number,))
+
+        connection.commit()
+
+    def _sql_authorizer(self, action, arg1, arg2, db_name, trigger):
+        """
+        Limits user queries to reading the mirrored table, which must match the editor data, and to
+        creating and dropping indexes. Other databases cannot be attached, so no files are written.
+        """
+        if action in self.sql_denied_actions:
+            return sqlite3.SQLITE_DENY
+        if action in (sqlite3.SQLITE_INSERT, sqlite3.SQLITE_UPDATE, sqlite3.SQLITE_DELETE):
+            # Creating an index writes to the schema tables, no other table may change
+            return sqlite3.SQLITE_OK if arg1.startswith('sqlite_') else sqlite3.SQLITE_DENY
+        if action == sqlite3.SQLITE_DROP_INDEX and arg1 == 'data_row':
+            return sqlite3.SQLITE_DENY
+        if action == sqlite3.SQLITE_PRAGMA and arg1.lower() not in self.sql_allowed_pragmas:
+            return sqlite3.SQLITE_DENY
+        return sqlite3.SQLITE_OK
+
+    def _resolve_column(self, headers, column, numbers=True):
+        """
+        Finds a column by header name or 1-based position.
+
+        Args:
+            headers (list): Column headers to search
+            column (str): Header name (case-insensitive) or column number
+            numbers (bool): Whether column numbers are accepted
+
+        Returns:
+            int: Zero-based column index, or None if no such column exists
+        """
+        column = column.strip()
+        if column in headers:
+            return headers.index(column)
+
+        lowered_headers = [header.lower() for header in headers]
+        if column.lower() in lowered_headers:
+            return lowered_headers.index(column.lower())
+
+        if numbers and column.isdigit() and 1 <= int(column) <= len(headers):
+            return int(column) - 1
+
+        return None
+
+    def _diff_column_pairs(self, old_headers, new_headers):
+        """
+        Pairs the columns of two tables for comparison.
+
+        Columns are matched by name if both header rows have unique names and columns were
+        reordered, added or removed. Otherwise they are matched by position, so renamed columns
+        are reported as changed headers.
+
+        Returns:
+            list: (name, old_index, new_index) tuples, indexes are None for missing columns
+        """
+        names_unique = len(set(old_headers)) == len(old_headers) and len(set(new_headers)) == len(new_headers)
+        match_by_name = names_unique and (set(old_headers) == set(new_headers) or len(old_headers) != len(new_headers))
+        if old_headers == new_headers or not match_by_name:
+            return [
+                (new_name if new_name is not None else old_name, i, i)
+                for i, (old_name, new_name) in enumerate(zip_longest(old_headers, new_headers))
+            ]
+
+        column_pairs = []
+        for new_index, name in enumerate(new_headers):
+            old_index = old_headers.index(name) if name in old_headers else None
+            column_pairs.append((name, old_index, new_index))
+        for old_index, name in enumerate(old_headers):
+            if name not in new_headers:
+                column_pairs.append((name, old_index, None))
+        return column_pairs
+
+    def _longest_increasing_anchors(self, candidates):
+        """Returns the longest subsequence of (old_index, new_index) pairs that is increasing in both indexes."""
+        tail_values = []
+        tail_positions = []
+        predecessors = [None] * len(candidates)
+
+        for position, (old_index, _) in enumerate(candidates):
+            slot = bisect.bisect_left(tail_values, old_index)
+            if slot == len(tail_values):
+                tail_values.append(old_index)
+                tail_positions.append(position)
+            else:
+                tail_values[slot] = old_index
+                tail_positions[slot] = position
+            predecessors[position] = tail_positions[slot - 1] if slot > 0 else None
+
+        anchors = []
+        position = tail_positions[-1] if tail_positions else None
+        while position is not None:
+            anchors.append(candidates[position])
+            position = predecessors[position]
+        anchors.reverse()
+        return anchors
+
+    def _match_rows(self, old_hashes, new_hashes):
+        """
+        Aligns two row sequences with a hash-based patience diff.
+
+        Rows occurring exactly once on both sides serve as anchors, the regions between
+        anchors are aligned the same way. Small regions without unique rows fall back to
+        difflib, large ones are reported as replaced, so the runtime stays near linear.
+
+        Returns:
+            list: (old_index, new_index) pairs of matching rows in ascending order
+        """
+        max_fallback_region = 1_000_000
+        matches = []
+        tasks = [('region', 0, len(old_hashes), 0, len(new_hashes))]
+
+        while tasks:
+            task = tasks.pop()
+            if task[0] == 'match':
+                _, old_start, new_start, size = task
+                matches.extend(zip(range(old_start, old_start + size), range(new_start, new_start + size)))
+                continue
+
+            _, old_low, old_high, new_low, new_high = task
+
+            while old_low < old_high and new_low < new_high and old_hashes[old_low] == new_hashes[new_low]:
+                matches.append((old_low, new_low))
+                old_low += 1
+                new_low += 1
+
+            # Suffix matches are processed after the region in between, so they go on the stack first
+            suffix_size = 0
+            while old_low < old_high and new_low < new_high and old_hashes[old_high - 1] == new_hashes[new_high - 1]:
+                old_high -= 1
+                new_high -= 1
+                suffix_size += 1
+            if suffix_size:
+                tasks.append(('match', old_high, new_high, suffix_size))
+
+            if old_low == old_high or new_low == new_high:
+                continue
+
+            old_region = old_hashes[old_low:old_high]
+            new_region = new_hashes[new_low:new_high]
+            old_counts = Counter(old_region)
+            new_counts = Counter(new_region)
+            old_positions = {row_hash: i for i, row_hash in enumerate(old_region, old_low)}
+
+            candidates = [
+                (old_positions[row_hash], j) for j, row_hash in enumerate(new_region, new_low)
+                if new_counts[row_hash] == 1 and old_counts[row_hash] == 1
+            ]
+
+            if candidates:
+                if all(a[0] < b[0] for a, b in zip(candidates, candidates[1:])):
+                    anchors = candidates
+                else:
+                    anchors = self._longest_increasing_anchors(candidates)
+
+                # Consecutive anchors are merged into runs to keep the task stack small
+                subtasks = []
+                previous_old, previous_new = old_low, new_low
+                for old_index, new_index in anchors:
+                    if old_index == previous_old and new_index == previous_new and subtasks and subtasks[-1][0] == 'match':
+                        _, run_old, run_new, run_size = subtasks[-1]
+                        subtasks[-1] = ('match', run_old, run_new, run_size + 1)
+                    else:
+                        subtasks.append(('region', previous_old, old_index, previous_new, new_index))
+                        subtasks.append(('match', old_index, new_index, 1))
+                    previous_old, previous_new = old_index + 1, new_index + 1
+                subtasks.append(('region', previous_old, old_high, previous_new, new_high))
+                tasks.extend(reversed(subtasks))
+
+            elif (old_high - old_low) * (new_high - new_low) <= max_fallback_region:
+                matcher = difflib.SequenceMatcher(None, old_region, new_region, autojunk=False)
+                for old_start, new_start, size in matcher.get_matching_blocks():
+                    matches.extend(zip(range(old_low + old_start, old_low + old_start + size),
+                                       range(new_low + new_start, new_low + new_start + size)))
+
+        return matches
+
+    def _compare_tables(self, old_headers, old_rows, new_headers, new_rows, key_column=None):
+        """
+        Compares two tables row by row.
+
+        Rows are aligned by the values of a key column if one is given, otherwise by position.
+
+        Args:
+            old_headers (list): Headers of the old table
+            old_rows (list): Rows of the old table
+            new_headers (list): Headers of the new table
+            new_rows (list): Rows of the new table
+            key_column (str): Optional key column name or number
+
+        Returns:
+            tuple: (changes, summary)
+                - changes (list): (change, old_row, new_row, column, old_value, new_value) tuples
+                - summary (dict): Counts of added, removed and changed rows, changed cells and duplicate keys
+
+        Raises:
+            ValueError: If the key column does not exist in both tables
+        """
+        column_pairs = self._diff_column_pairs(old_headers, new_headers)
+        changes = []
+        summary = {'added': 0, 'removed': 0, 'changed': 0, 'cells': 0, 'duplicates': 0}
+
+        for name, old_index, new_index in column_pairs:
+            if old_index is None:
+                changes.append((self._("column added"), '', '', name, '', ''))
+            elif new_index is None:
+                changes.append((self._("column removed"), '', '', name, '', ''))
+            elif old_index < len(old_headers) and new_index < len(new_headers) and old_headers[old_index] != new_headers[new_index]:
+                changes.append((self._("header changed"), '', '', old_index + 1, old_headers[old_index], new_headers[new_index]))
+
+        def cell(row, index):
+            return row[index] if index is not None and index < len(row) else ''
+
+        def row_key_function(indexes):
+            width = len(indexes)
+            if indexes == list(range(width)):
+                # Fast path for tables compared column by column
+                def row_key(row):
+                    if len(row) == width:
+                        return tuple(row)
+                    return tuple(row[:width]) + ('',) * (width - len(row))
+                return row_key
+
+            def row_key(row):
+                return tuple(cell(row, index) for index in indexes)
+            return row_key
+
+        old_key = row_key_function([old_index for _, old_index, _ in column_pairs])
+        new_key = row_key_function([new_index for _, _, new_index in column_pairs])
+
+        def row_text(row):
+            return " | ".join(row)
+
+        def compare_pair(old_number, old_row, new_number, new_row):
+            changed_cells = [
+                (name, cell(old_row, old_index), cell(new_row, new_index))
+                for name, old_index, new_index in column_pairs
+                if cell(old_row, old_index) != cell(new_row, new_index)
+            ]
+            if changed_cells:
+                summary['changed'] += 1
+                summary['cells'] += len(changed_cells)
+                for name, old_value, new_value in changed_cells:
+                    changes.append((self._("changed"), old_number, new_number, name, old_value, new_value))
+
+        def add_removed(old_number, old_row):
+            summary['removed'] += 1
+            changes.append((self._("removed"), old_number, '', '', row_text(old_row), ''))
+
+        def add_added(new_number, new_row):
+            summary['added'] += 1
+            changes.append((self._("added"), '', new_number, '', '', row_text(new_row)))
+
+        if key_column:
+            old_key_index = self._resolve_column(old_headers, key_column)
+            new_key_index = self._resolve_column(new_headers, key_column)
+            if old_key_index is None or new_key_index is None:
+                raise ValueError(self._("Key column '%(column)s' not found in both files.") % {'column': key_column})
+
+            old_by_key = {}
+            for i, row in enumerate(old_rows):
+                key = cell(row, old_key_index)
+                if key in old_by_key:
+                    summary['duplicates'] += 1
+                else:
+                    old_by_key[key] = i
+
+            seen_keys = set()
+            for j, row in enumerate(new_rows):
+                key = cell(row, new_key_index)
+                if key in seen_keys:
+                    summary['duplicates'] += 1
+                    continue
+                seen_keys.add(key)
+                if key in old_by_key:
+                    i = old_by_key[key]
+                    compare_pair(i + 1, old_rows[i], j + 1, row)
+                else:
+                    add_added(j + 1, row)
+
+            for key, i in old_by_key.items():
+                if key not in seen_keys:
+                    add_removed(i + 1, old_rows[i])
+
+            return changes, summary
+
+        old_hashes = [hash(old_key(row)) for row in old_rows]
+        new_hashes = [hash(new_key(row)) for row in new_rows]
+        matches = self._match_rows(old_hashes, new_hashes)
+        matches.append((len(old_rows), len(new_rows)))
+
+        def compare_gap(old_low, old_high, new_low, new_high):
+            # Rows between two matches are aligned by their first cell, the rest is paired
+            # positionally if the rows have anything in common
+            first_cell_matches = self._match_rows(
+                [hash(old_key(old_rows[i])[:1]) for i in range(old_low, old_high)],
+                [hash(new_key(new_rows[j])[:1]) for j in range(new_low, new_high)]
+            )
+            first_cell_matches.append((old_high - old_low, new_high - new_low))
+
+            old_position, new_position = old_low, new_low
+            for old_offset, new_offset in first_cell_matches:
+                old_match, new_match = old_low + old_offset, new_low + new_offset
+                for i, j in zip_longest(range(old_position, old_match), range(new_position, new_match)):
+                    if i is None:
+                        add_added(j + 1, new_rows[j])
+                    elif j is None:
+                        add_removed(i + 1, old_rows[i])
+                    elif any(a == b for a, b in zip(old_key(old_rows[i]), new_key(new_rows[j]))):
+                        compare_pair(i + 1, old_rows[i], j + 1, new_rows[j])
+                    else:
+                        add_removed(i + 1, old_rows[i])
+                        add_added(j + 1, new_rows[j])
+                if old_match < old_high:
+                    compare_pair(old_match + 1, old_rows[old_match], new_match + 1, new_rows[new_match])
+                old_position, new_position = old_match + 1, new_match + 1
+
+        old_position, new_position = 0, 0
+        for old_match, new_match in matches:
+            if old_position < old_match or new_position < new_match:
+                compare_gap(old_position, old_match, new_position, new_match)
+            if old_match < len(old_rows) and old_key(old_rows[old_match]) != new_key(new_rows[new_match]):
+                # Rows are matched by hash, rows with colliding hashes are still compared cell by cell
+                compare_pair(old_match + 1, old_rows[old_match], new_match + 1, new_rows[new_match])
+            old_position, new_position = old_match + 1, new_match + 1
+
+        return changes, summary
+
+
+class Sivvy(Table):
+    """Interactive terminal editor on top of the table engine."""
+    # List of supported table output formats
+    SUPPORTED_TABLE_FORMATS = [
+        "plain", "simple", "github", "grid", "simple_grid", "rounded_grid", 
+        "heavy_grid", "mixed_grid", "double_grid", "fancy_grid", "outline", "simple_outline", 
+        "rounded_outline", "heavy_outline", "mixed_outline", "double_outline", "fancy_outline", 
+        "pipe", "orgtbl", "asciidoc", "jira", "presto", "pretty", 
+        "psql", "rst", "mediawiki", "moinmoin", "youtrack", "html", 
+        "unsafehtml", "latex", "latex_raw", "latex_booktabs", "latex_longtable", 
+        "textile", "tsv"
+    ]
+
+    supported_delimiter_keywords = {
+        'TAB': '\t',
+        'SPACE': ' ',
+        'SEMICOLON': ';',
+        'PIPE': '|',
+        'COMMA': ','
+    }
+
+    # File extensions for exported table formats, all others are exported as .txt
+    export_extensions = {
+        'github': '.md', 'pipe': '.md', 'html': '.html', 'unsafehtml': '.html', 'latex': '.tex',
+        'latex_raw': '.tex', 'latex_booktabs': '.tex', 'latex_longtable': '.tex', 'rst': '.rst',
+        'mediawiki': '.wiki', 'asciidoc': '.adoc', 'textile': '.textile', 'orgtbl': '.org', 'tsv': '.tsv'
+    }
+
+    # Output formats of --convert by file extension, jsonl and tsv files may also be compressed
+    conversion_formats = {
+        '.jsonl': 'jsonl', '.ndjson': 'jsonl', '.tsv': 'tsv', '.sqlite': 'sqlite', '.sqlite3': 'sqlite', '.db': 'sqlite'
+    }
+
+    def __init__(self, filename, display_range=None, table_format="simple", column_delimiter=",", manual_delimiter_set=False, output_filename=None, load_file=True, compression_level=None, columns=None, schema_filename=None, progressive=True):
+        # Determine current script directory
+        if getattr(sys, 'frozen', False):
+            self.scriptdir = Path(sys.executable).parent
+        else:
+            self.scriptdir = Path(__file__).parent.absolute()
+
+        # Set a nice title for windows users
+        if os.name == 'nt': os.system('title Sivvy')
+
+        super().__init__(
+            filename, delimiter=column_delimiter if manual_delimiter_set else None, columns=columns,
+            schema_filename=schema_filename, compression_level=compression_level, load_file=False, progressive=progressive
+        )
+        self.show_all_messages = False
+        self.display_range = display_range
+
+        # Setup our methods
+        self.setup_signal_handlers()
+        self.setup_localization()
+        self.check_table_format(table_format)
+        if load_file:
+            self._load_csv()
+
+    def clear_console(self):
+        """Clears the console screen."""
+        os.system('cls' if os.name == 'nt' else 'clear')
+
+    def setup_signal_handlers(self):
+        """Setup signal handlers for graceful termination"""
+        signal.signal(signal.SIGINT, self.handle_exit_signal)
+        signal.signal(signal.SIGTERM, self.handle_exit_signal)
+
+    def handle_exit_signal(self, signum, frame):
+        """Handle exit signals"""
+        print("\n Exiting...")
+        sys.exit(0)
+
+    def setup_localization(self):
+        """Setup localization settings"""
+        system_language = locale.getlocale()
+        try:
+            if os.name == 'nt':
+                os.environ['LANG'] = system_language[0] + '.utf8'
+                locale.setlocale(locale.LC_ALL, system_language[0] + '.utf8')
+            else:
+                locale.setlocale(locale.LC_ALL, '')
+        except locale.Error as e:
+            print(f"Warning: Error while setting locale: {e} Trying fallback to default 'C' locale.")
+            try:
+                locale.setlocale(locale.LC_ALL, 'C')
+            except locale.Error as e_fallback:
+                print(f"Error falling back to 'C' locale: {e_fallback}. Locale not set.")
+
+        gettext.bindtextdomain('sivvy', str(self.scriptdir / 'locale'))
+        gettext.textdomain('sivvy')
+        self._ = gettext.gettext
+
+    def _validate_filename(self, filename):
+        """
+        Validates a file name for problematic characters.
+
+        Args:
+            filename (str): file name to validate
+
+        Returns:
+            tuple: (is_valid, error_message)
+                - is_valid (bool): True if valid, False if not valid
+                - error_message (str): Error message for invalid file names
+        """
+        if not filename or not filename.strip():
+            return False, self._("Filename cannot be empty.")
+
+        # Remove whitespace
+        filename = filename.strip()
+
+        # Check for problematic characters (Windows and Unix)
+        invalid_chars = '<>:"/\\|?*'
+        found_invalid = [char for char in invalid_chars if char in filename]
+        if found_invalid:
+            return False, self._("Invalid characters in filename: %(chars)s") % {
+                'chars': ', '.join(found_invalid)
+            }
+
+        # Check for reserved file names (Windows)
+        reserved_names = ['CON', 'PRN', 'AUX', 'NUL', 'COM1', 'COM2', 'COM3', 'COM4', 
+                         'COM5', 'COM6', 'COM7', 'COM8', 'COM9', 'LPT1', 'LPT2', 'LPT3', 
+                         'LPT4', 'LPT5', 'LPT6', 'LPT7', 'LPT8', 'LPT9']
+
+        name_without_ext = filename.split('.')[0].upper()
+        if name_without_ext in reserved_names:
+            return False, self._("'%(name)s' is a reserved filename.") % {'name': filename}
+
+        # Check for long file names (255 chars)
+        if len(filename) > 255:
+            return False, self._("Filename is too long (maximum 255 characters).")
+
+        # Check if file name only contains dots
+        if filename.replace('.', '').strip() == '':
+            return False, self._("Filename cannot consist only of dots.")
+
+        return True, ""
+
+    def show_message(self, message, msg_type='info', pause=False, store=True):
+        """
+        Unified message handling system.
+
+        Args:
+            message (str): The message to display
+            msg_type (str): 'info', 'warning', 'error' - determines formatting and behavior
+            persist (bool): Whether message should persist across screen clears
+            pause (bool): Whether to pause for user input after displaying
+            store (bool): Whether to store message in status list
+        """
+
+        super().show_message(message, msg_type, pause, store)
+
+        if msg_type == 'error' or msg_type == 'warning' or pause:
+            # Format message based on type
+            print(self._format_message(message, msg_type))
+            if pause or msg_type == 'error':
+                input(self._("Press Enter to continue..."))
+
+    def display_status_messages(self):
+        """Show all saved status messages."""
+        if not self.status_messages:
+            return
+
+        print("=" * 50)
+        print(self._("Status Messages:"))
+        print("=" * 50)
+
+        messages_to_show = self.status_messages
+        if not self.show_all_messages and len(self.status_messages) > 5:
+            messages_to_show = self.status_messages[-5:]
+            print(self._("(Showing last 5 messages - enter 's' to see all)"))
+
+        for msg in messages_to_show:
+            print(f"[{msg['timestamp']}] {self._format_message(msg['message'], msg['type'])}")
+
+        print("=" * 50)
+
+    def toggle_message_display(self):
+        """Switches between compact and full message display."""
+        self.show_all_messages = not self.show_all_messages
+        status = self._("all") if self.show_all_messages else self._("recent")
+        self.show_message(
+            self._("Message display mode: %(mode)s") % {'mode': status}, 
+            'info', 
+            store=False
+        )
+
+    def _format_message(self, message, msg_type):
+        """Format message based on type."""
+        if msg_type == 'error':
+            return f"\a❌ {message}"  # Bell sound + error icon
+        elif msg_type == 'warning':
+            return f"⚠  {message}"   # Warning icon
+        else:
+            return f"ℹ  {message}"    # Info icon
+
+    def _get_headers_from_user(self):
+        """Prompts the user to enter column names."""
+        print(self._("Please enter column names separated by commas."))
+        header_input = input(self._("Column names: "))
+        headers = [h.strip() for h in header_input.split(',') if h.strip()]
+        if not headers:
+            self.show_message(self._("No column names entered. Using default headers."), 'info')
+            headers = ["Column 1", "Column 2", "Column 3"]
+        return headers
+
+    def _headers_for_new_file(self):
+        """Asks for the headers of a new or empty file."""
+        return self._get_headers_from_user()
+
+    def check_table_format(self, table_format):
+        """Check if table output format is valid, otherwise use default."""
+        if table_format in self.SUPPORTED_TABLE_FORMATS:
+            self.table_format = table_format
+        else:
+            self.show_message(self._("Warning: Invalid output format '%(format)s' entered. Falling back to default format 'simple'.") % {'format': table_format}, 'warning')
+            self.table_format = "simple"
+
+    def display_loading_progress(self):
+        """Shows the background loading progress in the status area."""
+        if not self.loading:
+            return
+        rows, percent = self._loading_progress()
+        print(self._("Loading: %(rows)s rows (%(percent)s%%)...") % {'rows': rows, 'percent': percent})
+
+    def _wait_for_loading(self):
+        """Waits until background loading has finished. Needed by operations that work on the whole table."""
+        if self.loading:
+            print(self._("This needs the whole table, waiting for the file to finish loading..."))
+            while self.loading:
+                self.load_thread.join(0.5)
+                rows, percent = self._loading_progress()
+                print("\r" + self._("Loading: %(rows)s rows (%(percent)s%%)...") % {'rows': rows, 'percent': percent}, end='', flush=True)
+            print()
+        self._check_loading()
+
+    def _save_csv(self, initial_save=False):
+        """Saves current data to csv file."""
+        try:
+            self.save()
+            if not initial_save:
+                # No special status messages here as the program exits anyway
+                print(self._("Saved changes in '%(file)s'.") % {'file': self.filename})
+        except IOError as e:
+            print(self._("Error saving '%(file)s': %(error)s") % {'file': self.filename, 'error': e})
+        except Exception as e:
+            print(self._("An unexpected error occurred while saving: %(error)s") % {'error': e})
+
+    def display_table(self, output_filename=None, show_index=True):
+        """Displays data in the terminal as a formatted table, optionally with row limit."""
+        data_to_display = self.data
+        start_row, end_row = None, None
+
+        if self.display_range:
+            start_row = max(0, self.display_range[0] - 1) 
+            end_row = min(len(self.data), self.display_range[1]) 
+
+            if start_row < end_row:
+                data_to_display = self.data[start_row:end_row]
+                print("\n--- " + self._("Displaying rows %(start)s to %(end)s") % {'start': start_row + 1, 'end': end_row} + " ---")
+            else:
+                self.show_message("\n" + self._("Invalid or empty display range. Loading the entire file."), 'warning')
+                data_to_display = self.data 
+                self.display_range = None
+                start_row, end_row = None, None
+
+        if not self.display_range and self.loading:
+            # Rendering grows with every loaded row, so only the first screen is shown meanwhile
+            data_to_display = self.data[:self.first_screen_rows]
+            print("\n--- " + self._("Displaying rows 1 to %(end)s while the file is loading") % {'end': len(data_to_display)} + " ---")
+
+        first_index = (start_row if start_row is not None else 0) + 1
+        table_data, table_headers, column_alignment = self._prepare_table(data_to_display, first_index, show_index)
+
+        table_output = tabulate(table_data, headers=table_headers, tablefmt=self.table_format, disable_numparse=True, colalign=column_alignment)
+        self._write_table_output(table_output, output_filename)
+
+    def _prepare_table(self, rows, first_index=1, show_index=True):
+        """
+        Pads or truncates rows to the number of headers and adds the row index, ready for tabulate.
+
+        Args:
+            rows (list): Rows to show
+            first_index (int): Row index of the first row
+            show_index (bool): Add the row index as first column
+
+        Returns:
+            tuple: (table data, table headers, column alignment)
+        """
+        width = len(self.headers)
+        table_data = [row if len(row) == width else (row + [''] * (width - len(row)))[:width] for row in self._logical_rows(rows)]
+        table_headers = self.headers
+
+        # Numeric columns are right-aligned, cells are still shown exactly as stored
+        column_alignment = ['right' if self._column_type(i) in ('int', 'float') else 'left' for i in range(width)]
+
+        if show_index:
+            table_data = [[index] + row for index, row in enumerate(table_data, first_index)]
+            table_headers = [self._("Index")] + self.headers
+            column_alignment.insert(0, 'left')
+
+        return table_data, table_headers, column_alignment
+
+    def export_formats(self, table_formats, output_dir='.', show_index=False):
+        """
+        Exports the table in several formats at once without any prompts.
+
+        The table is loaded and prepared once, the formats are rendered in parallel processes.
+        The display range limits the exported rows.
+
+        Args:
+            table_formats (list): Formats from SUPPORTED_TABLE_FORMATS
+            output_dir (str): Directory for the exported files, created if needed
+            show_index (bool): Add the row index as first column
+
+        Returns:
+            int: Exit status, 0 on success, 2 on errors
+        """
+        invalid_formats = [table_format for table_format in table_formats if table_format not in self.SUPPORTED_TABLE_FORMATS]
+        if invalid_formats or not table_formats:
+            print(f"Error: Invalid output formats: {', '.join(invalid_formats) or '-'}")
+            print("Available formats: " + ", ".join(self.SUPPORTED_TABLE_FORMATS))
+            return 2
+        if not os.path.isfile(self.filename) or not os.path.getsize(self.filename):
+            print(f"Error: File '{self.filename}' not found or empty.")
+            return 2
+
+        start_time = time.perf_counter()
+        try:
+            self._load_csv()
+            self._wait_for_loading()
+            if self.load_error is not None:
+                raise self.load_error
+            Path(output_dir).mkdir(parents=True, exist_ok=True)
+        except (OSError, EOFError, lzma.LZMAError, UnicodeDecodeError, csv.Error) as e:
+            print(f"Error: {e}")
+            return 2
+
+        rows = self.data
+        first_index = 1
+        if self.display_range:
+            first_index = max(1, self.display_range[0])
+            rows = self.data[first_index - 1:self.display_range[1]]
+        table = self._prepare_table(rows, first_index, show_index)
+        print(f"Prepared {len(rows)} rows in {time.perf_counter() - start_time:.2f} seconds.")
+
+        name = Path(self.filename).name
+        for suffix in [extension for _, extensions, _ in self.compression_formats.values() for extension in extensions] + ['.csv']:
+            if name.lower().endswith(suffix):
+                name = name[:-len(suffix)]
+        jobs = [
+            (table_format, str(Path(output_dir) / f"{name}-{table_format}{self.export_extensions.get(table_format, '.txt')}"))
+            for table_format in dict.fromkeys(table_formats)
+        ]
+
+        max_workers = min(len(jobs), os.cpu_count() or 1)
+        try:
+            if max_workers > 1:
+                # Each worker receives the prepared table once
+                with ProcessPoolExecutor(max_workers, initializer=_init_export_worker, initargs=table) as executor:
+                    futures = [executor.submit(_render_export, table_format, output_filename) for table_format, output_filename in jobs]
+                    seconds = [future.result() for future in futures]
+            else:
+                _init_export_worker(*table)
+                seconds = [_render_export(table_format, output_filename) for table_format, output_filename in jobs]
+        except OSError as e:
+            print(f"Error: {e}")
+            return 2
+
+        for (table_format, output_filename), format_seconds in zip(jobs, seconds):
+            print(f"{table_format:>16}  {format_seconds:6.2f}s  {output_filename}")
+        print(f"Exported {len(jobs)} formats in {time.perf_counter() - start_time:.2f} seconds.")
+        return 0
+
+    def _write_table_output(self, table_output, output_filename=None):
+        """Prints a rendered table or writes it to a file, falling back to the screen on errors."""
+        if output_filename:
+            try:
+                output_path = Path(output_filename)
+                output_path.parent.mkdir(parents=True, exist_ok=True)
+                with open(output_filename, 'w', encoding='utf-8') as f:
+                    print(table_output, file=f)
+                self.show_message(
+                    self._("The current table's output was exported to file '%(file)s'.") % {'file': output_filename},
+                    'info'
+                )
+
+            except PermissionError:
+                self.show_message(
+                    self._("Permission denied: Cannot access file '%(file)s'.") % {'file': output_filename},
+                    'error',
+                    store=False
+                )
+                print(table_output)
+
+            except OSError as e:
+                self.show_message(
+                    self._("Error saving '%(file)s': %(error)s") % {'file': output_filename, 'error': e},
+                    'error',
+                    store=False
+                )
+                print(table_output)
+
+            except Exception as e:
+                self.show_message(
+                    self._("An unexpected error occurred while saving: %(error)s") % {'error': e},
+                    'error',
+                    store=False
+                )
+                print(table_output)
+
+        else:
+            print(table_output)
+
+    def _edit_headers(self):
+        """Edits the column headers."""
+        print("\n--- " + self._("Editing column headers") + " ---")
+        print(self._("Enter new values. Leave empty to retain the current value."))
+
+        new_headers = []
+        for i, header in enumerate(self.headers):
+            new_value = input(self._("Column %(num)s (current: '%(current)s'): ") % {'num': i + 1, 'current': header}).strip()
+            if new_value == '':
+                new_headers.append(header)
+            else:
+                new_headers.append(new_value)
+
+        self.headers = new_headers
+        self.table_modified = True
+        self._reset_sql_mirror()
+        self.show_message(self._("Column headers have been updated."), 'info')
+        if self.validator is not None:
+            for message in self.validator.check_headers(self.headers, self.schema_columns):
+                self.show_message(message, 'warning')
+
+    def _edit_or_add_row(self, row_index):
+        """Edits an existing row or adds a new one."""
+        if row_index >= len(self.data):
+            self._wait_for_loading()
+        original_row_count = len(self.data)
+
+        if row_index >= original_row_count:
+            if row_index > original_row_count:
+                # No status message, will be displayed below the table
+                print(self._("Row index %(index)s is higher than the maximum number of rows (%(maxrows)s).") % {'index': row_index + 1, 'maxrows': original_row_count})
+                fill_gap = input(self._("Should the gap be filled with %(rows)s empty rows?") % {'rows': row_index - original_row_count} + " (y/n): ").strip().lower()
+                if fill_gap == 'y':
+                    for _ in range(row_index - original_row_count):
+                        self._insert_row(len(self.data), self._stored_row([''] * len(self.headers)))
+                    self.show_message(
+                        self._("Added %(rows)s empty rows.") % {'rows': row_index - original_row_count}, 
+                        'info'
+                    )
+                else:
+                    row_index = original_row_count
+
+            new_row = self._stored_row([''] * len(self.headers))
+            self._insert_row(len(self.data), new_row)
+            self.show_message(self._("Adding new row %(index)s.") % {'index': row_index + 1}, 'info')
+
+        row_to_edit = self._logical_row(self.data[row_index])
+
+        print("\n--- " + self._("Editing row %(index)s") % {'index': row_index + 1} + " ---")
+        print(self._("Enter new values. Leave empty to retain the current value."))
+
+        edited_row = []
+        for i, header in enumerate(self.headers):
+            current_value = row_to_edit[i] if i < len(row_to_edit) else ''
+            prompt = self._("%(header)s (current: '%(current)s'): ") % {'header': header, 'current': current_value}
+            new_value = input(prompt).strip()
+
+            # Keep typed columns valid, unless the user decides to treat the column as text
+            while new_value and not self._value_fits_column_type(i, new_value):
+                keep_value = input(
+                    self._("'%(value)s' is not a valid %(type)s value. Keep it and treat the column as text?") % {
+                        'value': new_value,
+                        'type': self._column_type(i)
+                    } + " (y/n): "
+                ).strip().lower()
+                if keep_value == 'y':
+                    self._set_column_type(i, 'text')
+                    break
+                new_value = input(prompt).strip()
+
+            if new_value == '':
+                edited_row.append(current_value)
+            else:
+                edited_row.append(new_value)
+
+        self._replace_row(row_index, self._stored_row(edited_row, self.data[row_index]))
+
+        self.show_message(self._("Row %(index)s has been updated.") % {'index': row_index + 1}, 'info')
+        if self.validator is not None:
+            for column, message in self.validator.row_problems(self.data[row_index], edited_row):
+                column_name = self.headers[column] if column is not None else self._("Row")
+                self.show_message(f"{column_name}: {message}", 'warning')
+
+    def _delete_row(self, row_index):
+        """Deletes a row with confirmation"""
+        if row_index >= len(self.data):
+            self._wait_for_loading()
+        if row_index < 0 or row_index >= len(self.data):
+            self.show_message(
+                self._("Invalid row index %(index)s. Valid range: 1-%(max)s") % {
+                    'index': row_index + 1, 
+                    'max': len(self.data)
+                }, 
+                'warning'
+            )
+            return False
+
+        row_to_delete = self._logical_row(self.data[row_index])
+        print("\n--- " + self._("Deleting row %(index)s") % {'index': row_index + 1} + " ---")
+
+        for i, (header, value) in enumerate(zip(self.headers, row_to_delete)):
+            print(f"{header}: {value}")
+
+        confirm = input(self._("Delete this row?") + " (y/n): ").strip().lower()
+
+        if confirm == 'y':
+            deleted_origin = self.row_origins[row_index] if self.column_projection is not None else -1
+            deleted_row = self._remove_row(row_index)
+            self.show_message(
+                self._("Row %(index)s deleted successfully.") % {'index': row_index + 1}, 
+                'info'
+            )
+
+            self._add_undo_entry({
+                'type': 'row',
+                'index': row_index,
+                'data': deleted_row,
+                'origin': deleted_origin
+            })
+
+            return True
+        else:
+            self.show_message(self._("Aborted."), 'info')
+            return False
+
+    def _display_row(self, row_index):
+        """Detailed row display"""
+        if row_index >= len(self.data):
+            self._wait_for_loading()
+        if row_index < 0 or row_index >= len(self.data):
+            self.show_message(
+                self._("Invalid row index %(index)s. Valid range: 1-%(max)s") % {
+                    'index': row_index + 1, 
+                    'max': len(self.data)
+                }, 
+                'warning'
+            )
+            return False
+
+        row_to_display = self._logical_row(self.data[row_index])
+        print("\n--- " + self._("Displaying row %(index)s") % {'index': row_index + 1} + " ---")
+
+        for i, (header, value) in enumerate(zip(self.headers, row_to_display)):
+            print(f"{header}: {value}")
+
+        input(self._("Press Enter to continue..."))
+
+    def _set_key_column(self, column_input):
+        """Sets the key column and builds the index from key values to rows, or turns lookups by key off."""
+        if not column_input:
+            self.key_column = None
+            self.key_index = None
+            self.show_message(self._("Lookups by key turned off."), 'info')
+            return
+
+        column_index = self._resolve_column(self.headers, column_input)
+        if column_index is None:
+            self.show_message(self._("Column '%(column)s' not found.") % {'column': column_input}, 'warning')
+            return
+
+        self.key_column = column_index
+        start_time = time.perf_counter()
+        self._build_key_index()
+        self.show_message(
+            self._("Key column '%(column)s': %(keys)s keys indexed in %(seconds).2f seconds.") % {
+                'column': self.headers[column_index],
+                'keys': len(self.key_index),
+                'seconds': time.perf_counter() - start_time
+            },
+            'info'
+        )
+        if self.duplicate_keys:
+            self.show_message(
+                self._("%(count)s keys occur more than once, e.g. %(keys)s. Lookups use the first row with a key.") % {
+                    'count': len(self.duplicate_keys),
+                    'keys': ', '.join(f"'{key}'" for key, _ in self.duplicate_keys.most_common(5))
+                },
+                'warning'
+            )
+
+    def _key_command(self, action, key):
+        """Views ('v'), edits ('e') or deletes ('d') the row with a key."""
+        if self.key_column is None:
+            self.show_message(self._("No key column set. Use 'k <column>' first."), 'warning')
+            return
+        if not key:
+            self.show_message(self._("Please enter a key."), 'warning')
+            return
+
+        row_index = self._find_key(key)
+        if row_index is None:
+            self.show_message(
+                self._("No row with key '%(key)s' in column '%(column)s'.") % {'key': key, 'column': self.headers[self.key_column]},
+                'warning'
+            )
+            return
+        if key in self.duplicate_keys:
+            self.show_message(
+                self._("Key '%(key)s' occurs more than once, using row %(index)s.") % {'key': key, 'index': row_index + 1},
+                'warning'
+            )
+
+        if action == 'v':
+            self._display_row(row_index)
+        elif action == 'e':
+            self._edit_or_add_row(row_index)
+        else:
+            self._delete_row(row_index)
+
+    def _export_table(self):
+        """Exports current table view as text file"""
+        self._wait_for_loading()
+        print(f"\n--- {self._('Table export')} ---")
+        print(self._("This function exports the current table view as a text file in the program's directory."))
+
+        export_path = self._ask_export_path()
+        if export_path is None:
+            return
+
+        show_index_input = input(self._("Include row index in export?") + " (y/n): ").strip().lower()
+        show_index = show_index_input == 'y'
+
+        self.display_table(export_path, show_index)
+
+    def _ask_export_path(self):
+        """
+        Asks for an export file name in the program's directory.
+
+        Returns:
+            Path: The confirmed export path, or None if the export was cancelled
+        """
+        print(self._("Enter the desired file name, press Enter for the default file name 'sivvy_output.txt' or 'c' to cancel."))
+
+        while True:
+            filename_input = input(self._("Export filename (default: 'sivvy_output.txt'): ")).strip()
+            if filename_input.lower() == 'c':
+                self.show_message(self._("Aborted."), 'info')
+                return None
+            if not filename_input:
+                filename_input = 'sivvy_output.txt'
+            is_valid, error_message = self._validate_filename(filename_input)
+            if not is_valid:
+                print(f"❌ {error_message}")
+                print(self._("Please enter a valid filename."))
+                continue
+            export_path = self.scriptdir / filename_input
+            if export_path.exists():
+                overwrite = input(self._("File '%(file)s' already exists. Overwrite?") % {'file': filename_input} + " (y/n): ").strip().lower()
+                if overwrite != 'y':
+                    self.show_message(self._("Aborted."), 'info')
+                    return None
+            return export_path
+
+    def _parse_split_command(self, user_input):
+        """Parse split commands."""
+        parts = user_input.split()
+
+        if len(parts) != 2:
+            self.show_message(
+                self._("Invalid split command. Usage: <command> <row_number>"), 
+                'warning'
+            )
+            return None
+
+        try:
+            row_number = int(parts[1])
+            if row_number <= 0:
+                self.show_message(
+                    self._("Row number must be positive."), 
+                    'warning'
+                )
+                return None
+
+            return row_number - 1
+
+        except ValueError:
+            self.show_message(
+                self._("Invalid row number: %(number)s") % {'number': parts[1]}, 
+                'warning'
+            )
+            return None
+
+    def _show_undo_history(self):
+        """Show undo history."""
+        if not self.undo_history:
+            self.show_message(self._("No deleted rows to restore."), 'info')
+            return
+
+        print(f"\n--- {self._('Undo History')} ---")
+        for i, deleted_item in enumerate(reversed(self.undo_history)):
+            if deleted_item['type'] != 'row':
+                print(f"{i + 1}. {deleted_item['description']} [{deleted_item['timestamp']}]")
+                print()
+                continue
+
+            print(f"{i + 1}. {self._('Row')} {deleted_item['index'] + 1} [{deleted_item['timestamp']}]")
+
+            deleted_row = self._logical_row(deleted_item['data'])
+            preview_data = deleted_row[:3]
+            preview_headers = self.headers[:3]
+            preview_str = " | ".join([f"{h}: {v}" for h, v in zip(preview_headers, preview_data)])
+            print(f"   {preview_str}{'...' if len(deleted_row) > 3 else ''}")
+            print()
+
+    def _undo_delete(self):
+        """Restores a deleted line or undoes a batch operation."""
+        if not self.undo_history:
+            self.show_message(self._("No deleted rows to restore."), 'info')
+            return
+
+        self._show_undo_history()
+
+        try:
+            choice = input(self._("Enter number to restore (or press Enter to cancel): ")).strip()
+
+            if not choice:
+                self.show_message(self._("Aborted."), 'info')
+                return
+
+            undo_index = int(choice) - 1
+
+            if undo_index < 0 or undo_index >= len(self.undo_history):
+                self.show_message(
+                    self._("Invalid choice. Please enter a number between 1 and %(max)s") % {
+                        'max': len(self.undo_history)
+                    }, 
+                    'warning'
+                )
+                return
+
+            deleted_item = self.undo_history[-(undo_index + 1)]
+
+            if deleted_item['type'] != 'row':
+                # Removed first, undoing a column change can lay out the rest of the history
+                self.undo_history.pop(-(undo_index + 1))
+                self._undo_batch(deleted_item)
+                self.show_message(
+                    self._("Undone: %(operation)s") % {'operation': deleted_item['description']},
+                    'info'
+                )
+                return
+
+            print(f"\n{self._('Restoring row:')} {deleted_item['index'] + 1}")
+            for header, value in zip(self.headers, self._logical_row(deleted_item['data'])):
+                print(f"{header}: {value}")
+
+            restore_position = input(
+                self._("Restore at position (1-%(max)s, or Enter for original position %(orig)s): ") % {
+                    'max': len(self.data) + 1,
+                    'orig': deleted_item['index'] + 1
+                }
+            ).strip()
+
+            if restore_position:
+                try:
+                    position = int(restore_position) - 1
+                    if position < 0 or position > len(self.data):
+                        self.show_message(self._("Invalid position. Using original position."), 'warning')
+                        position = min(deleted_item['index'], len(self.data))
+                except ValueError:
+                    self.show_message(self._("Invalid position. Using original position."), 'warning')
+                    position = min(deleted_item['index'], len(self.data))
+            else:
+                position = min(deleted_item['index'], len(self.data))
+
+            self._insert_row(position, deleted_item['data'], deleted_item['origin'])
+
+            self.undo_history.pop(-(undo_index + 1))
+
+            self.show_message(
+                self._("Row restored at position %(pos)s") % {'pos': position + 1}, 
+                'info'
+            )
+
+        except ValueError:
+            self.show_message(self._("Invalid input. Please enter a number."), 'warning')
+        except Exception as e:
+            self.show_message(
+                self._("Error during undo: %(error)s") % {'error': e}, 
+                'error'
+            )
+
+    def _join_table(self):
+        """Adds or fills columns from a reference csv file, matched by a key column."""
+        self._wait_for_loading()
+        self._apply_column_map()
+        print("\n--- " + self._("Join with reference file") + " ---")
+        print(self._("Columns of a second csv file are added to the table, or fill empty cells of columns with the same name."))
+
+        reference_filename = input(self._("Reference file (or press Enter to cancel): ")).strip()
+        if not reference_filename:
+            self.show_message(self._("Aborted."), 'info')
+            return
+
+        try:
+            reference_headers, reference_rows, _ = self._read_csv_file(reference_filename)
+        except (OSError, EOFError, lzma.LZMAError, UnicodeDecodeError) as e:
+            self.show_message(
+                self._("Could not read reference file: %(error)s") % {'error': e},
+                'warning'
+            )
+            return
+
+        key_input = input(self._("Key column in this table: ")).strip()
+        key_index = self._resolve_column(self.headers, key_input)
+        if key_index is None:
+            self.show_message(self._("Column '%(column)s' not found.") % {'column': key_input}, 'warning')
+            return
+
+        reference_key_input = input(self._("Key column in reference file (Enter for '%(column)s'): ") % {'column': self.headers[key_index]}).strip()
+        reference_key_index = self._resolve_column(reference_headers, reference_key_input or self.headers[key_index])
+        if reference_key_index is None:
+            self.show_message(self._("Column '%(column)s' not found.") % {'column': reference_key_input or self.headers[key_index]}, 'warning')
+            return
+
+        columns_input = input(self._("Columns to take over, separated by commas (Enter for all other columns): ")).strip()
+        if columns_input:
+            reference_columns = []
+            for column in columns_input.split(','):
+                column_index = self._resolve_column(reference_headers, column)
+                if column_index is None:
+                    self.show_message(self._("Column '%(column)s' not found.") % {'column': column.strip()}, 'warning')
+                    return
+                reference_columns.append(column_index)
+        else:
+            reference_columns = [i for i in range(len(reference_headers)) if i != reference_key_index]
+
+        join_type = input(self._("Join type: left keeps all rows, inner removes rows without a match (l/i, default l): ")).strip().lower()
+        inner_join = join_type == 'i'
+
+        start_time = time.perf_counter()
+
+        # Hash index of the reference file, the first row of duplicate keys wins
+        reference_index = {}
+        duplicate_keys = 0
+        for row in reference_rows:
+            key = row[reference_key_index].strip() if reference_key_index < len(row) else ''
+            if key in reference_index:
+                duplicate_keys += 1
+            else:
+                reference_index[key] = row
+
+        # Columns with a matching name are filled, the others are appended as one undoable column change
+        added_headers = [
+            reference_headers[column_index] for column_index in reference_columns
+            if reference_headers[column_index] not in self.headers
+        ]
+        added_columns = len(added_headers)
+        if added_headers:
+            stored_width = None
+            if self.column_projection is None:
+                column_map = self._prepare_column_change()
+                stored_width = self.stored_width + added_columns
+                column_map.extend(range(self.stored_width, stored_width))
+            else:
+                # Only some columns are loaded, columns added in the session follow them in the rows
+                column_map = None
+            self._change_column_layout(
+                self._("Join added %(columns)s columns") % {'columns': added_columns},
+                self.headers + added_headers, column_map, self.column_defaults, stored_width
+            )
+        targets = [
+            (column_index, self.headers.index(reference_headers[column_index]), reference_headers[column_index] not in added_headers)
+            for column_index in reference_columns
+        ]
+
+        matched_rows = 0
+        unmatched_rows = set()
+        cells = []
+        for i, row in enumerate(self.data):
+            key = self._cell(row, key_index).strip()
+            reference_row = reference_index.get(key)
+            if reference_row is None:
+                unmatched_rows.add(i)
+                continue
+
+            matched_rows += 1
+            for column_index, target_index, fill_only in targets:
+                value = reference_row[column_index] if column_index < len(reference_row) else ''
+                if fill_only and self._cell(row, target_index) != '':
+                    continue
+                cells.append((i, target_index, value))
+        filled_cells = self.set_cells(cells, self._("Join filled %(cells)s cells") % {'cells': len(cells)})
+        # The added columns were empty when they were classified
+        self._classify_columns([self.headers.index(header) for header in added_headers])
+
+        if inner_join and unmatched_rows:
+            removed_rows = self._remove_rows(unmatched_rows)
+            self._add_undo_entry({
+                'type': 'rows',
+                'description': self._("Inner join removed %(rows)s rows") % {'rows': len(removed_rows)},
+                'rows': removed_rows
+            })
+
+        elapsed = time.perf_counter() - start_time
+        self.show_message(
+            self._("Joined '%(file)s': %(matched)s rows matched, %(cells)s cells filled, %(columns)s columns added in %(seconds).2f seconds.") % {
+                'file': reference_filename,
+                'matched': matched_rows,
+                'cells': filled_cells,
+                'columns': added_columns,
+                'seconds': elapsed
+            },
+            'info'
+        )
+        if unmatched_rows:
+            if inner_join:
+                message = self._("%(rows)s rows without a matching key were removed (can be undone with 'u').")
+            else:
+                message = self._("%(rows)s rows have no matching key in the reference file.")
+            self.show_message(message % {'rows': len(unmatched_rows)}, 'warning')
+        if duplicate_keys:
+            self.show_message(
+                self._("%(count)s duplicate keys in the reference file were ignored, the first occurrence was used.") % {'count': duplicate_keys},
+                'warning'
+            )
+
+    def _append_from_file(self):
+        """Appends all rows of another csv file, mapping its columns by header name."""
+        print("\n--- " + self._("Append rows") + " ---")
+        source_filename = input(self._("File to append (Enter to cancel): ")).strip()
+        if not source_filename:
+            self.show_message(self._("Aborted."), 'info')
+            return
+
+        self._wait_for_loading()
+        self._apply_column_map()
+        start_time = time.perf_counter()
+        row_count = len(self.data)
+
+        def append_rows(headers, rows, delimiter, encoding):
+            # Called again from the start if the file needs another encoding
+            self._truncate_rows(row_count)
+            return self._map_appended_rows(headers, rows, self._extend_rows)
+
+        try:
+            appended_count, skipped_count, skipped_rows, ignored_columns = self._stream_csv_file(source_filename, append_rows)
+        except (OSError, EOFError, lzma.LZMAError, UnicodeDecodeError, ValueError, csv.Error) as e:
+            self._truncate_rows(row_count)
+            self.show_message(
+                self._("Cannot append '%(file)s': %(error)s") % {'file': source_filename, 'error': e},
+                'warning'
+            )
+            return
+
+        if appended_count:
+            # Appending alone does not mark the table as modified, so saving can append to the file
+            self._reset_sql_mirror()
+        elapsed = time.perf_counter() - start_time
+
+        self.show_message(
+            self._("Appended %(rows)s rows from '%(file)s' in %(seconds).2f seconds (%(rate)s rows per second).") % {
+                'rows': appended_count,
+                'file': source_filename,
+                'seconds': elapsed,
+                'rate': int(appended_count / elapsed) if elapsed else appended_count
+            },
+            'info'
+        )
+        if skipped_count:
+            self.show_message(
+                self._("Skipped %(count)s rows with a wrong number of columns, e.g. rows %(rows)s.") % {
+                    'count': skipped_count,
+                    'rows': ', '.join(str(row_number) for row_number in skipped_rows)
+                },
+                'warning'
+            )
+        if ignored_columns:
+            self.show_message(
+                self._("Ignored columns not in the table: %(columns)s") % {'columns': ', '.join(ignored_columns)},
+                'warning'
+            )
+
+    def append_file(self, source_filename):
+        """
+        Appends all rows of another csv file or of standard input ('-') to the file without opening the editor.
+
+        Rows are streamed to the end of uncompressed files, of which only the headers and samples
+        from the start and the end are read to find their encoding.
+        Compressed files are loaded, extended and saved again, new files take the columns
+        of the source.
+
+        Returns:
+            int: Exit status, 0 on success, 2 on errors
+        """
+        start_time = time.perf_counter()
+        try:
+            if self._can_append_to_file():
+                # The first lines alone may not show that the file is not UTF-8
+                encoding = self._detect_file_encoding(self.filename)
+                with self._open_csv_file(self.filename, encoding=encoding) as csvfile:
+                    self.headers, self.delimiter, self.encoding = self._process_csv_stream(
+                        csvfile, encoding, lambda headers, rows, delimiter, encoding: (headers, delimiter, encoding)
+                    )
+                original_size = os.path.getsize(self.filename)
+
+                def append_rows(headers, rows, delimiter, encoding):
+                    # Called again from the start if the source needs another encoding
+                    os.truncate(self.filename, original_size)
+                    return self._map_appended_rows(headers, rows, self._append_rows_to_file)
+
+                try:
+                    result = self._stream_csv_file(source_filename, append_rows)
+                except BaseException:
+                    # A failed source leaves the file as it was
+                    os.truncate(self.filename, original_size)
+                    raise
+            else:
+                if os.path.exists(self.filename) and os.path.getsize(self.filename) > 0:
+                    self._load_csv()
+                    self._wait_for_loading()
+                row_count = len(self.data)
+
+                def append_rows(headers, rows, delimiter, encoding):
+                    # New files take the columns of the source
+                    if not self.headers:
+                        self.headers = list(headers)
+                    self._truncate_rows(row_count)
+                    return self._map_appended_rows(headers, rows, self._extend_rows)
+
+                result = self._stream_csv_file(source_filename, append_rows)
+                # Unlike _save_csv, save raises errors, so a failed write is reported by the exit status
+                self.save()
+        except (OSError, EOFError, lzma.LZMAError, UnicodeDecodeError, ValueError, csv.Error) as e:
+            print(f"Error: {e}")
+            return 2
+
+        appended_count, skipped_count, skipped_rows, ignored_columns = result
+        elapsed = time.perf_counter() - start_time
+        rate = int(appended_count / elapsed) if elapsed else appended_count
+        print(f"Appended {appended_count} rows to '{self.filename}' in {elapsed:.2f} seconds ({rate} rows per second).")
+        if skipped_count:
+            print(f"Skipped {skipped_count} rows with a wrong number of columns, e.g. rows {', '.join(map(str, skipped_rows))}.")
+        if ignored_columns:
+            print(f"Ignored columns not in '{self.filename}': {', '.join(ignored_columns)}")
+        return 0
+
+    def _replace_values(self):
+        """Replaces a literal text or regular expression in many cells as one undoable batch."""
+        self._wait_for_loading()
+        self._apply_column_map()
+        print("\n--- " + self._("Find and replace") + " ---")
+
+        search = input(self._("Search for: "))
+        if not search:
+            self.show_message(self._("Aborted."), 'info')
+            return
+        use_regex = input(self._("Use regular expression?") + " (y/n): ").strip().lower() == 'y'
+        replacement = input(self._("Replace with: "))
+        columns_input = input(self._("Columns to search, separated by commas (Enter for all columns): ")).strip()
+
+        try:
+            column_indexes = self._resolve_column_list(self.headers, columns_input.split(',') if columns_input else None)
+            pattern = re.compile(search) if use_regex else None
+        except (ValueError, re.error) as e:
+            self.show_message(str(e), 'warning')
+            return
+
+        start_time = time.perf_counter()
+        changes = []
+        match_count = 0
+        try:
+            for i, row in enumerate(self.data):
+                for column in column_indexes:
+                    if column >= len(row):
+                        continue
+                    value = row[column]
+                    if pattern is None:
+                        if search not in value:
+                            continue
+                        matches = value.count(search)
+                        new_value = value.replace(search, replacement)
+                    else:
+                        new_value, matches = pattern.subn(replacement, value)
+                        if not matches:
+                            continue
+                    match_count += matches
+                    if new_value != value:
+                        changes.append((i, row, column, value, new_value))
+        except re.error as e:
+            self.show_message(self._("Invalid replacement: %(error)s") % {'error': e}, 'warning')
+            return
+        elapsed = time.perf_counter() - start_time
+
+        if not changes:
+            self.show_message(self._("No matching cells found."), 'info')
+            return
+
+        max_preview_cells = 10
+        preview = [
+            [i + 1, self.headers[column], value, new_value]
+            for i, row, column, value, new_value in changes[:max_preview_cells]
+        ]
+        print(tabulate(preview, headers=[self._("Row"), self._("Column"), self._("Current"), self._("New")],
+                       tablefmt=self.table_format, disable_numparse=True))
+        print("\n" + self._("%(matches)s matches in %(cells)s cells found in %(seconds).2f seconds.") % {
+            'matches': match_count,
+            'cells': len(changes),
+            'seconds': elapsed
+        })
+        confirm = input(self._("Replace all matches?") + " (y/n): ").strip().lower()
+        if confirm != 'y':
+            self.show_message(self._("Aborted."), 'info')
+            return
+
+        start_time = time.perf_counter()
+        self._set_cells([(row, column, new_value) for i, row, column, value, new_value in changes])
+        elapsed = time.perf_counter() - start_time
+
+        self._add_undo_entry({
+            'type': 'cells',
+            'description': self._("Replaced '%(search)s' in %(cells)s cells") % {'search': search, 'cells': len(changes)},
+            'cells': [(row, column, value) for i, row, column, value, new_value in changes]
+        })
+        self.show_message(
+            self._("Replaced %(matches)s matches in %(cells)s cells in %(seconds).2f seconds (%(rate)s cells per second).") % {
+                'matches': match_count,
+                'cells': len(changes),
+                'seconds': elapsed,
+                'rate': int(len(changes) / elapsed) if elapsed else len(changes)
+            },
+            'info'
+        )
+
+    def _column_input(self, text):
+        """
+        Turns a column entered by name or 1-based number into a zero-based index for the table methods.
+
+        Returns:
+            int: Column index, the entered text if no column matches, or None if nothing was entered
+        """
+        text = text.strip()
+        if not text:
+            return None
+        column_index = self._resolve_column(self.headers, text)
+        return text if column_index is None else column_index
 
-        for i, (header, value) in enumerate(zip(self.headers, row_to_delete)):
-            print(f"{header}: {value}")
+    def _column_operations(self):
+        """Inserts, removes, moves, renames, splits or merges a column as one step that can be undone."""
+        print("\n--- " + self._("Column operations") + " ---")
+        print(", ".join(f"{number}: {header}" for number, header in enumerate(self.headers, 1)))
+        print(self._("i = insert, d = remove, m = move, n = rename, s = split, g = merge"))
+        operation = input(self._("Operation (Enter to cancel): ")).strip().lower()
 
-        confirm = input(self._("Delete this row?") + " (y/n): ").strip().lower()
+        description = None
+        try:
+            if operation == 'i':
+                header = input(self._("Name of the new column: ")).strip()
+                if header:
+                    position = self._column_input(input(self._("Insert before column (name or number, Enter for the end): ")))
+                    default = input(self._("Value for all rows (Enter for empty cells): "))
+                    description = self.insert_column(header, position, default)
+            elif operation == 'd':
+                column = self._column_input(input(self._("Column to remove: ")))
+                if column is not None:
+                    description = self.drop_column(column)
+            elif operation == 'm':
+                column = self._column_input(input(self._("Column to move: ")))
+                if column is not None:
+                    position = self._column_input(input(self._("Move before column (name or number, Enter for the end): ")))
+                    description = self.move_column(column, position)
+            elif operation == 'n':
+                column = self._column_input(input(self._("Column to rename: ")))
+                header = input(self._("New name: ")).strip()
+                if column is not None and header:
+                    description = self.rename_column(column, header)
+            elif operation == 's':
+                column = self._column_input(input(self._("Column to split: ")))
+                if column is not None:
+                    separator = input(self._("Separator: "))
+                    headers_input = input(self._("Names of the new columns, separated by commas: "))
+                    headers = [header.strip() for header in headers_input.split(',') if header.strip()]
+                    description = self.split_column(column, separator, headers)
+            elif operation == 'g':
+                columns_input = input(self._("Columns to merge, separated by commas: "))
+                header = input(self._("Name of the merged column: ")).strip()
+                if header:
+                    separator = input(self._("Separator (Enter for a space): ")) or ' '
+                    columns = [self._column_input(column) for column in columns_input.split(',') if column.strip()]
+                    description = self.merge_columns(columns, header, separator)
+        except ValueError as e:
+            self.show_message(str(e), 'warning')
+            return
 
-        if confirm == 'y':
-            deleted_row = self.data.pop(row_index)
-            self.show_message(
-                self._("Row %(index)s deleted successfully.") % {'index': row_index + 1}, 
-                'info'
-            )
+        if description is None:
+            self.show_message(self._("Aborted."), 'info')
+            return
+        self.show_message(self._("%(operation)s (can be undone with 'u').") % {'operation': description}, 'info')
 
-            self.deleted_rows.append({
-                'index': row_index,
-                'data': deleted_row,
-                'timestamp': self._get_current_time()
-            })
+    def _remove_duplicates(self):
+        """Finds duplicate rows by their fingerprints and deletes all but the first row of each group."""
+        self._wait_for_loading()
+        print("\n--- " + self._("Remove duplicate rows") + " ---")
 
-            if len(self.deleted_rows) > self.max_undo_history:
-                self.deleted_rows.pop(0)
+        columns_input = input(self._("Columns to compare, separated by commas (Enter for whole rows): ")).strip()
+        try:
+            column_indexes = self._resolve_column_list(self.headers, columns_input.split(',') if columns_input else None)
+        except ValueError as e:
+            self.show_message(str(e), 'warning')
+            return
+        normalize = input(self._("Ignore differences in case and whitespace?") + " (y/n): ").strip().lower() == 'y'
+
+        start_time = time.perf_counter()
+        fingerprint = self._row_fingerprint_function(column_indexes, normalize)
+        first_rows = {}
+        groups = {}
+        for i, row in enumerate(self._logical_rows(self.data)):
+            first_row = first_rows.setdefault(fingerprint(row), i)
+            if first_row != i:
+                groups.setdefault(first_row, []).append(i)
+        elapsed = time.perf_counter() - start_time
+
+        duplicate_count = sum(len(duplicates) for duplicates in groups.values())
+        if not duplicate_count:
+            self.show_message(self._("No duplicate rows found."), 'info')
+            return
 
-            return True
-        else:
+        max_preview_groups = 10
+        for group_number, (first_row, duplicates) in enumerate(islice(groups.items(), max_preview_groups), 1):
+            print("\n" + self._("Group %(number)s (%(rows)s rows):") % {'number': group_number, 'rows': len(duplicates) + 1})
+            group_rows = [[i + 1] + self._logical_row(self.data[i])[:len(self.headers)] for i in [first_row] + duplicates]
+            print(tabulate(group_rows, headers=[self._("Index")] + self.headers, tablefmt=self.table_format, disable_numparse=True))
+        if len(groups) > max_preview_groups:
+            print("\n" + self._("... and %(groups)s more groups.") % {'groups': len(groups) - max_preview_groups})
+
+        print("\n" + self._("%(rows)s duplicate rows in %(groups)s groups found in %(seconds).2f seconds.") % {
+            'rows': duplicate_count,
+            'groups': len(groups),
+            'seconds': elapsed
+        })
+        confirm = input(self._("Delete the duplicates and keep the first row of each group?") + " (y/n): ").strip().lower()
+        if confirm != 'y':
             self.show_message(self._("Aborted."), 'info')
-            return False
+            return
 
-    def _display_row(self, row_index):
-        """Detailed row display"""
-        if row_index < 0 or row_index >= len(self.data):
+        removed_rows = self._remove_rows(set(chain.from_iterable(groups.values())))
+        self._add_undo_entry({
+            'type': 'rows',
+            'description': self._("Removed %(rows)s duplicate rows") % {'rows': len(removed_rows)},
+            'rows': removed_rows
+        })
+        self.show_message(
+            self._("Removed %(rows)s duplicate rows (can be undone with 'u').") % {'rows': len(removed_rows)},
+            'info'
+        )
+
+    def dedup_file(self, input_filename, output_filename, columns=None, normalize=False):
+        """
+        Writes a copy of a csv file without duplicate rows, keeping the first row of each group.
+
+        Fingerprints are kept in memory up to dedup_memory_limit distinct rows. Larger files
+        are processed again with fingerprints sorted externally in temporary files, so memory
+        stays bounded even for files larger than RAM.
+
+        Returns:
+            int: Exit status, 0 on success, 2 on errors
+        """
+        start_time = time.perf_counter()
+        try:
+            result = self._stream_csv_file(
+                input_filename,
+                lambda headers, rows, delimiter, encoding: self._dedup_rows_in_memory(headers, rows, delimiter, output_filename, columns, normalize)
+            )
+            if result is None:
+                print(f"More than {self.dedup_memory_limit} distinct rows, switching to external sorting...")
+                result = self._stream_csv_file(
+                    input_filename,
+                    lambda headers, rows, delimiter, encoding: self._dedup_rows_external(
+                        headers, rows, delimiter, encoding, input_filename, output_filename, columns, normalize
+                    )
+                )
+        except (OSError, EOFError, lzma.LZMAError, UnicodeDecodeError, ValueError, csv.Error) as e:
+            print(f"Error: {e}")
+            return 2
+
+        row_count, duplicate_count = result
+        print(f"Read {row_count} rows, removed {duplicate_count} duplicates, wrote {row_count - duplicate_count} rows "
+              f"to '{output_filename}' in {time.perf_counter() - start_time:.2f} seconds.")
+        return 0
+
+    def _show_schema_problems(self):
+        """Lists the rows that break the rules of the schema."""
+        if self.validator is None:
             self.show_message(
-                self._("Invalid row index %(index)s. Valid range: 1-%(max)s") % {
-                    'index': row_index + 1, 
-                    'max': len(self.data)
-                }, 
-                'warning'
+                self._("No schema loaded. Create '%(file)s' or use --schema.") % {'file': f"{self.filename}.schema.json"},
+                'info'
             )
-            return False
+            return
 
-        row_to_display = self.data[row_index]
-        print("\n--- " + self._("Displaying row %(index)s") % {'index': row_index + 1} + " ---")
+        self._wait_for_loading()
+        max_listed_problems = 50
+        listed_problems = []
+        problem_count = 0
+        if self.validator.problems or self.validator.duplicate_count:
+            for i, row in enumerate(self.data):
+                for column, message in self.validator.row_problems(row, self._logical_row(row)):
+                    problem_count += 1
+                    if len(listed_problems) < max_listed_problems:
+                        column_name = self.headers[column] if column is not None else ''
+                        listed_problems.append([i + 1, column_name, message])
+
+        print("\n--- " + self._("Schema check") + " ---")
+        if not problem_count:
+            print(self._("All rows are valid."))
+        else:
+            print(tabulate(listed_problems, headers=[self._("Row"), self._("Column"), self._("Problem")],
+                           tablefmt=self.table_format, disable_numparse=True))
+            if problem_count > max_listed_problems:
+                print(self._("... and %(count)s more problems.") % {'count': problem_count - max_listed_problems})
+        input(self._("Press Enter to continue..."))
 
-        for i, (header, value) in enumerate(zip(self.headers, row_to_display)):
-            print(f"{header}: {value}")
+    def _show_column_types(self):
+        """Shows the type of each column with statistics computed from the typed storage."""
+        if self.typed_columns is None:
+            self._build_typed_columns()
+
+        summary = []
+        for column, header in enumerate(self.headers):
+            column_type = self._column_type(column)
+            if column not in self.typed_columns:
+                empty = sum(1 for row in self.data if not self._cell(row, column).strip())
+                summary.append([header, column_type, len(self.data) - empty, empty, '', '', '', ''])
+                continue
 
+            values, mask = self.typed_columns[column]
+            valid_values = list(compress(values, mask))
+            count = len(valid_values)
+            if not count:
+                summary.append([header, column_type, 0, len(mask), '', '', '', ''])
+                continue
+
+            minimum, maximum = min(valid_values), max(valid_values)
+            if column_type == 'date':
+                date_format = self.column_date_formats[column]
+                minimum = date.fromordinal(minimum).strftime(date_format)
+                maximum = date.fromordinal(maximum).strftime(date_format)
+                total, mean = '', ''
+            else:
+                total = sum(valid_values)
+                mean = f"{total / count:.6g}"
+            summary.append([header, column_type, count, len(mask) - count, minimum, maximum, total, mean])
+
+        summary_headers = [
+            self._("Column"), self._("Type"), self._("Values"), self._("Empty"),
+            self._("Minimum"), self._("Maximum"), self._("Sum"), self._("Mean")
+        ]
+        print("\n--- " + self._("Column types") + " ---")
+        print(tabulate(summary, headers=summary_headers, tablefmt=self.table_format, disable_numparse=True))
         input(self._("Press Enter to continue..."))
 
-    def _export_table(self):
-        """Exports current table view as text file"""
-        print(f"\n--- {self._('Table export')} ---")
-        print(self._("This function exports the current table view as a text file in the program's directory."))
-        print(self._("Enter the desired file name, press Enter for the default file name 'sivvy_output.txt' or 'c' to cancel."))
+    def _print_profile(self, headers, profile):
+        """Prints the column profiles and the sampled rows of a TableProfile."""
+        def shorten(value, length=20):
+            return value if len(value) <= length else value[:length - 1] + '…'
+
+        summary = []
+        for header, column in zip(headers, profile.columns):
+            distinct, exact = column.distinct()
+            top_values = ', '.join(f"{shorten(value)} ({count})" for value, count in column.top_values(3))
+            if column.count:
+                shortest, mean, percentile, longest = column.length_statistics()
+                lengths = f"{shortest}/{mean:.1f}/{percentile}/{longest}"
+                empty = f"{column.empty_count} ({column.empty_count / column.count:.1%})"
+            else:
+                lengths, empty = '', ''
+            summary.append([
+                header, distinct if exact else f"~{distinct}", empty, top_values,
+                shorten(column.minimum or ''), shorten(column.maximum or ''), lengths
+            ])
+
+        summary_headers = [
+            self._("Column"), self._("Distinct"), self._("Empty"), self._("Frequent values"),
+            self._("Minimum"), self._("Maximum"), self._("Length (min/mean/p95/max)")
+        ]
+        print(tabulate(summary, headers=summary_headers, tablefmt=self.table_format, disable_numparse=True))
+        print(self._("~ marks estimated values. Frequent values of columns with many distinct values show lower bounds of their counts."))
+        if profile.sample:
+            print("\n--- " + self._("Sample of %(count)s rows") % {'count': len(profile.sample)} + " ---")
+            print(tabulate([[shorten(value, 30) for value in row] for row in profile.sample],
+                           headers=headers, tablefmt=self.table_format, disable_numparse=True))
+
+    def profile_file(self):
+        """
+        Profiles all columns of the file in one streaming pass without loading it into the table.
 
-        while True:
-            filename_input = input(self._("Export filename (default: 'sivvy_output.txt'): ")).strip()
-            if filename_input.lower() == 'c':
-                self.show_message(self._("Aborted."), 'info')
-                break
-            if not filename_input:
-                filename_input = 'sivvy_output.txt'
-            is_valid, error_message = self._validate_filename(filename_input)
-            if not is_valid:
-                print(f"❌ {error_message}")
-                print(self._("Please enter a valid filename."))
-                continue
-            export_path = self.scriptdir / filename_input
-            if export_path.exists():
-                overwrite = input(self._("File '%(file)s' already exists. Overwrite?") % {'file': filename_input} + " (y/n): ").strip().lower()
-                if overwrite != 'y':
-                    self.show_message(self._("Aborted."), 'info')
-                    break
-            show_index_input = input(self._("Include row index in export?") + " (y/n): ").strip().lower()
-            show_index = show_index_input == 'y'
+        Memory use does not depend on the file size: distinct and frequent values are estimated
+        with sketches and a fixed number of rows is sampled.
+
+        Returns:
+            int: Exit status, 0 on success, 2 on errors
+        """
+        start_time = time.perf_counter()
+        try:
+            headers, profile = self._stream_csv_file(
+                self.filename,
+                lambda headers, rows, delimiter, encoding: (headers, self._profile_rows(headers, rows))
+            )
+        except (OSError, EOFError, lzma.LZMAError, UnicodeDecodeError, csv.Error) as e:
+            print(f"Error: {e}")
+            return 2
+
+        elapsed = time.perf_counter() - start_time
+        megabytes = os.path.getsize(self.filename) / (1024 * 1024)
+        print(f"Profiled {profile.row_count} rows of '{self.filename}' in {elapsed:.2f} seconds "
+              f"({megabytes / elapsed if elapsed else megabytes:.1f} MB/s).")
+        self._print_profile(headers, profile)
+        return 0
+
+    def _show_column_profile(self):
+        """Shows approximate profiles of all columns of the table with a sample of rows."""
+        self._wait_for_loading()
+        profile = self._profile_rows(self.headers, iter(self._logical_rows(self.data)))
+        print("\n--- " + self._("Column profile of %(rows)s rows") % {'rows': profile.row_count} + " ---")
+        self._print_profile(self.headers, profile)
+        input(self._("Press Enter to continue..."))
 
-            self.display_table(export_path, show_index)
-            break
+    def convert_file(self, output_filename, overwrite=False):
+        """
+        Streams the file into JSON Lines, TSV or an SQLite table without loading it into the table.
 
-    def _parse_split_command(self, user_input):
-        """Parse split commands."""
-        parts = user_input.split()
+        The output format is chosen by the file extension. JSON Lines and TSV files are compressed
+        if the name ends with a compression extension, e.g. out.jsonl.gz. A table 'data' that already
+        exists in an SQLite database is only replaced if overwrite is set.
 
-        if len(parts) != 2:
+        Returns:
+            int: Exit status, 0 on success, 2 on errors
+        """
+        output_path = Path(output_filename.lower())
+        compression = None
+        for name, (_, extensions, _) in self.compression_formats.items():
+            if output_path.suffix in extensions:
+                compression = name
+                output_path = output_path.with_suffix('')
+        output_format = self.conversion_formats.get(output_path.suffix)
+        if output_format is None or (output_format == 'sqlite' and compression is not None):
+            print(f"Error: Unknown output format of '{output_filename}'. Use one of: {', '.join(self.conversion_formats)}")
+            return 2
+
+        converters = {
+            'jsonl': self._convert_to_jsonl,
+            'tsv': self._convert_to_tsv,
+            'sqlite': lambda *arguments: self._convert_to_sqlite(*arguments, overwrite=overwrite)
+        }
+        start_time = time.perf_counter()
+        try:
+            row_count = self._stream_csv_file(
+                self.filename,
+                lambda headers, rows, delimiter, encoding: converters[output_format](headers, rows, output_filename, compression)
+            )
+        except (OSError, EOFError, lzma.LZMAError, UnicodeDecodeError, ValueError, csv.Error, sqlite3.Error) as e:
+            print(f"Error: {e}")
+            return 2
+
+        elapsed = time.perf_counter() - start_time
+        megabytes = os.path.getsize(self.filename) / (1024 * 1024)
+        print(f"Converted {row_count} rows to '{output_filename}' in {elapsed:.2f} seconds "
+              f"({megabytes / elapsed if elapsed else megabytes:.1f} MB/s).")
+        return 0
+
+    def _run_query(self, statement):
+        """Runs an SQL statement against the in-memory mirror of the table."""
+        self._wait_for_loading()
+        if not statement:
             self.show_message(
-                self._("Invalid split command. Usage: <command> <row_number>"), 
+                self._("Invalid query command. Usage: sql <query>"),
                 'warning'
             )
-            return None
+            return
 
         try:
-            row_number = int(parts[1])
-            if row_number <= 0:
-                self.show_message(
-                    self._("Row number must be positive."), 
-                    'warning'
-                )
-                return None
-
-            return row_number - 1
-
-        except ValueError:
+            result_headers, result_rows = self.query(statement)
+        except sqlite3.Error as e:
             self.show_message(
-                self._("Invalid row number: %(number)s") % {'number': parts[1]}, 
+                self._("Query failed: %(error)s") % {'error': e},
                 'warning'
             )
-            return None
-
-    def _show_undo_history(self):
-        """Show undo history."""
-        if not self.deleted_rows:
-            self.show_message(self._("No deleted rows to restore."), 'info')
             return
 
-        print(f"\n--- {self._('Undo History')} ---")
-        for i, deleted_item in enumerate(reversed(self.deleted_rows)):
-            print(f"{i + 1}. {self._('Row')} {deleted_item['index'] + 1} [{deleted_item['timestamp']}]")
-
-            preview_data = deleted_item['data'][:3]
-            preview_headers = self.headers[:3]
-            preview_str = " | ".join([f"{h}: {v}" for h, v in zip(preview_headers, preview_data)])
-            print(f"   {preview_str}{'...' if len(deleted_item['data']) > 3 else ''}")
-            print()
-
-    def _undo_delete(self):
-        """Restores a deleted line."""
-        if not self.deleted_rows:
-            self.show_message(self._("No deleted rows to restore."), 'info')
+        if result_headers is None:
+            self.show_message(self._("Statement executed."), 'info')
             return
 
-        self._show_undo_history()
-
-        try:
-            choice = input(self._("Enter number to restore (or press Enter to cancel): ")).strip()
-
-            if not choice:
-                self.show_message(self._("Aborted."), 'info')
-                return
-
-            undo_index = int(choice) - 1
-
-            if undo_index < 0 or undo_index >= len(self.deleted_rows):
-                self.show_message(
-                    self._("Invalid choice. Please enter a number between 1 and %(max)s") % {
-                        'max': len(self.deleted_rows)
-                    }, 
-                    'warning'
-                )
-                return
-
-            deleted_item = self.deleted_rows[-(undo_index + 1)]
-
-            print(f"\n{self._('Restoring row:')} {deleted_item['index'] + 1}")
-            for header, value in zip(self.headers, deleted_item['data']):
-                print(f"{header}: {value}")
+        result_output = tabulate(result_rows, headers=result_headers, tablefmt=self.table_format, disable_numparse=True)
 
-            restore_position = input(
-                self._("Restore at position (1-%(max)s, or Enter for original position %(orig)s): ") % {
-                    'max': len(self.data) + 1,
-                    'orig': deleted_item['index'] + 1
-                }
-            ).strip()
+        print("\n--- " + self._("Query result") + " ---")
+        print(result_output)
+        self.show_message(
+            self._("Query returned %(rows)s rows.") % {'rows': len(result_rows)},
+            'info'
+        )
 
-            if restore_position:
-                try:
-                    position = int(restore_position) - 1
-                    if position < 0 or position > len(self.data):
-                        self.show_message(self._("Invalid position. Using original position."), 'warning')
-                        position = min(deleted_item['index'], len(self.data))
-                except ValueError:
-                    self.show_message(self._("Invalid position. Using original position."), 'warning')
-                    position = min(deleted_item['index'], len(self.data))
-            else:
-                position = min(deleted_item['index'], len(self.data))
+        export_result = input(self._("Export query result?") + " (y/n): ").strip().lower()
+        if export_result == 'y':
+            export_path = self._ask_export_path()
+            if export_path is not None:
+                self._write_table_output(result_output, export_path)
+
+    def _print_diff(self, changes, summary, old_label, new_label):
+        """Prints the result of a table comparison."""
+        print("\n--- " + self._("Differences between '%(old)s' and '%(new)s'") % {'old': old_label, 'new': new_label} + " ---")
+
+        if changes:
+            diff_headers = [
+                self._("Change"), self._("Old row"), self._("New row"),
+                self._("Column"), self._("Old value"), self._("New value")
+            ]
+            print(tabulate(changes, headers=diff_headers, tablefmt=self.table_format, disable_numparse=True))
+        else:
+            print(self._("No differences found."))
 
-            self.data.insert(position, deleted_item['data'])
+        print(self._("%(added)s rows added, %(removed)s rows removed, %(changed)s rows changed (%(cells)s cells).") % summary)
+        if summary['duplicates']:
+            print(self._("Warning: %(count)s rows with duplicate keys were skipped.") % {'count': summary['duplicates']})
 
-            self.deleted_rows.pop(-(undo_index + 1))
+    def diff_files(self, old_filename, new_filename, key_column=None):
+        """
+        Compares two csv files and prints the differences.
 
-            self.show_message(
-                self._("Row restored at position %(pos)s") % {'pos': position + 1}, 
-                'info'
+        Returns:
+            int: Exit status, 0 if the files match, 1 if they differ, 2 on errors
+        """
+        try:
+            old_headers, old_rows, _ = self._read_csv_file(old_filename)
+            new_headers, new_rows, _ = self._read_csv_file(new_filename)
+            changes, summary = self._compare_tables(old_headers, old_rows, new_headers, new_rows, key_column)
+        except (OSError, EOFError, lzma.LZMAError, UnicodeDecodeError, ValueError) as e:
+            print(f"Error: {e}")
+            return 2
+
+        self._print_diff(changes, summary, old_filename, new_filename)
+        return 1 if changes else 0
+
+    def _diff_against_disk(self, key_column=None):
+        """Compares the current table with the file on disk."""
+        self._wait_for_loading()
+        try:
+            disk_headers, disk_rows, _ = self._read_csv_file(self.filename)
+            if self.column_projection is not None:
+                # Compare only the loaded columns
+                disk_headers = [disk_headers[i] if i < len(disk_headers) else '' for i in self.column_projection]
+                disk_rows = [[row[i] if i < len(row) else '' for i in self.column_projection] for row in disk_rows]
+            changes, summary = self._compare_tables(
+                disk_headers, disk_rows, self.headers, list(self._logical_rows(self.data)), key_column
             )
-
-        except ValueError:
-            self.show_message(self._("Invalid input. Please enter a number."), 'warning')
-        except Exception as e:
+        except (OSError, EOFError, lzma.LZMAError, UnicodeDecodeError, ValueError) as e:
             self.show_message(
-                self._("Error during undo: %(error)s") % {'error': e}, 
-                'error'
+                self._("Could not compare with file on disk: %(error)s") % {'error': e},
+                'warning'
             )
+            return
+
+        self._print_diff(changes, summary, self.filename, self._("current table"))
+        input(self._("Press Enter to continue..."))
 
     def run(self):
         """Main editor loop"""
         while True:
+            self._check_loading()
             self.clear_console()
 
             print(self._("Welcome to Sivvy!"))
 
             # Show status messages above the table
             self.display_status_messages()
+            self.display_loading_progress()
 
             self.display_table()
 
             print("=" * 50)
-            user_input = input(self._("Command ('h' for help): ")).strip().lower()
+            raw_input = input(self._("Command ('h' for help): ")).strip()
+            user_input = raw_input.lower()
 
             match user_input:
                 case 'q':
@@ -848,7 +4813,19 @@ class Sivvy:
                     print(self._("- 'd <row_number>' to delete a row"))
                     print(self._("- 'u' to undo/restore deleted rows"))
                     print(self._("- 'v <row_number>' to display a row in a more detailed view"))
+                    print(self._("- 'k <column>' to look up rows by the values of a key column, 'k' to turn it off"))
+                    print(self._("- 'kv <key>', 'ke <key>', 'kd <key>' to view, edit or delete the row with a key"))
                     print(self._("- 'e' to export current table view as a file"))
+                    print(self._("- 'sql <query>' to query the table with SQL (table name: data, row number: _row)"))
+                    print(self._("- 'diff [key_column]' to compare the table with the file on disk"))
+                    print(self._("- 't' to show column types and statistics"))
+                    print(self._("- 'p' to profile all columns with distinct and frequent values"))
+                    print(self._("- 'j' to join columns from a reference file by a key column"))
+                    print(self._("- 'r' to find and replace text in all or selected columns"))
+                    print(self._("- 'col' to insert, remove, move, rename, split or merge columns"))
+                    print(self._("- 'a' to append all rows of another file"))
+                    print(self._("- 'dup' to find and remove duplicate rows"))
+                    print(self._("- 'schema' to list rows that break the rules of the schema file"))
                     print(self._("- 's' to toggle status message display"))
                     print(self._("- 'c' to clear status messages"))
                     print(self._("- 'q' to exit"))
@@ -863,9 +4840,45 @@ class Sivvy:
                 case 'e':
                     self._export_table()
                     continue
+                case 't':
+                    self._show_column_types()
+                    continue
+                case 'p':
+                    self._show_column_profile()
+                    continue
+                case 'j':
+                    self._join_table()
+                    continue
+                case 'r':
+                    self._replace_values()
+                    continue
+                case 'a':
+                    self._append_from_file()
+                    continue
 
                 case _:
-                    if user_input.startswith('d '):
+                    if user_input == 'sql' or user_input.startswith('sql '):
+                        self._run_query(raw_input[3:].strip())
+                        continue
+                    elif user_input == 'k' or user_input.startswith('k '):
+                        self._set_key_column(raw_input[1:].strip())
+                        continue
+                    elif user_input[:3] in ('kv ', 'ke ', 'kd '):
+                        self._key_command(user_input[1], raw_input[3:].strip())
+                        continue
+                    elif user_input == 'schema':
+                        self._show_schema_problems()
+                        continue
+                    elif user_input == 'dup':
+                        self._remove_duplicates()
+                        continue
+                    elif user_input == 'col':
+                        self._column_operations()
+                        continue
+                    elif user_input == 'diff' or user_input.startswith('diff '):
+                        self._diff_against_disk(raw_input[4:].strip() or None)
+                        continue
+                    elif user_input.startswith('d '):
                         row_index = self._parse_split_command(user_input)
                         if row_index is not None:
                             self._delete_row(row_index)
@@ -912,6 +4925,7 @@ def main():
 
     parser.add_argument(
         "filename",
+        nargs="?",
         help="Csv file path, will be created if it doesn't exist."
     )
 
@@ -938,8 +4952,112 @@ def main():
              "Available keywords: " + ", ".join(Sivvy.supported_delimiter_keywords)
     )
 
+    parser.add_argument(
+        "-c", "--columns",
+        type=str,
+        help="Load only the given columns, separated by commas (names or numbers, e.g. 'ID,Title,5').\n"
+             "All other columns are kept unchanged when saving."
+    )
+
+    parser.add_argument(
+        "--compression-level",
+        type=int,
+        choices=range(1, 10),
+        metavar="1-9",
+        help="Compression level used when saving compressed files (.gz, .bz2, .xz).\n"
+             "Compression is detected automatically. Default: 6."
+    )
+
+    parser.add_argument(
+        "--diff",
+        nargs=2,
+        metavar=("OLD", "NEW"),
+        help="Compare two csv files row by row and print added, removed and changed rows."
+    )
+
+    parser.add_argument(
+        "--schema",
+        metavar="FILE",
+        help="JSON schema file with rules for the columns. Default: <file>.schema.json, if it exists."
+    )
+
+    parser.add_argument(
+        "--append",
+        metavar="SOURCE",
+        help="Append all rows of the csv file SOURCE, or of standard input if SOURCE is '-', and exit.\n"
+             "Columns are matched by header name. Uncompressed files are not rewritten."
+    )
+
+    parser.add_argument(
+        "--dedup",
+        metavar="OUTPUT",
+        help="Write a copy of the file without duplicate rows to OUTPUT, keeping the first row of each group.\n"
+             "Works on files of any size without opening the editor."
+    )
+
+    parser.add_argument(
+        "--dedup-columns",
+        type=str,
+        help="Columns (names or numbers, separated by commas) compared by --dedup. Default: whole rows."
+    )
+
+    parser.add_argument(
+        "--dedup-normalize",
+        action="store_true",
+        help="Ignore differences in case and whitespace when comparing rows with --dedup."
+    )
+
+    parser.add_argument(
+        "--export",
+        metavar="FORMATS",
+        help="Export the table in the given formats, separated by commas (e.g. github,html,latex_booktabs), and exit.\n"
+             "Use --range to export only some rows."
+    )
+
+    parser.add_argument(
+        "--output-dir",
+        default=".",
+        help="Directory for files written by --export. Default: current directory."
+    )
+
+    parser.add_argument(
+        "--export-index",
+        action="store_true",
+        help="Include the row index in files written by --export."
+    )
+
+    parser.add_argument(
+        "--convert",
+        metavar="OUTPUT",
+        help="Convert the file to JSON Lines (.jsonl), TSV (.tsv) or an SQLite database (.sqlite, .db) and exit.\n"
+             "The file is streamed, so files of any size can be converted. SQLite tables are named 'data'."
+    )
+
+    parser.add_argument(
+        "--force",
+        action="store_true",
+        help="Replace the table 'data' if the SQLite database written by --convert already has one."
+    )
+
+    parser.add_argument(
+        "--profile-columns",
+        action="store_true",
+        help="Print distinct values, empty cells, frequent values, minimum, maximum and lengths of each column\n"
+             "and a sample of rows, then exit. The file is read once in fixed memory, counts of large files are estimated."
+    )
+
+    parser.add_argument(
+        "--key",
+        type=str,
+        help="Key column (name or number) to align rows by when comparing files with --diff.\n"
+             "Without a key, rows are aligned by position."
+    )
+
     args = parser.parse_args()
 
+    if args.filename is None and not args.diff:
+        parser.error("the following arguments are required: filename")
+
     processed_delimiter = ","
     manual_delimiter_set = False
 
@@ -965,6 +5083,27 @@ def main():
                 print("Valid examples: ';', 'TAB', '|', ','")
                 sys.exit(1)
 
+    if args.diff:
+        app = Sivvy(args.diff[1], table_format=args.format, column_delimiter=processed_delimiter, manual_delimiter_set=manual_delimiter_set, load_file=False, progressive=False)
+        sys.exit(app.diff_files(args.diff[0], args.diff[1], args.key))
+
+    if args.append:
+        app = Sivvy(args.filename, table_format=args.format, column_delimiter=processed_delimiter, manual_delimiter_set=manual_delimiter_set, load_file=False, compression_level=args.compression_level, progressive=False)
+        sys.exit(app.append_file(args.append))
+
+    if args.convert:
+        app = Sivvy(args.filename, table_format=args.format, column_delimiter=processed_delimiter, manual_delimiter_set=manual_delimiter_set, load_file=False, compression_level=args.compression_level, progressive=False)
+        sys.exit(app.convert_file(args.convert, args.force))
+
+    if args.profile_columns:
+        app = Sivvy(args.filename, table_format=args.format, column_delimiter=processed_delimiter, manual_delimiter_set=manual_delimiter_set, load_file=False, progressive=False)
+        sys.exit(app.profile_file())
+
+    if args.dedup:
+        app = Sivvy(args.filename, table_format=args.format, column_delimiter=processed_delimiter, manual_delimiter_set=manual_delimiter_set, load_file=False, compression_level=args.compression_level, progressive=False)
+        dedup_columns = [column for column in args.dedup_columns.split(',') if column.strip()] if args.dedup_columns else None
+        sys.exit(app.dedup_file(args.filename, args.dedup, dedup_columns, args.dedup_normalize))
+
     display_range = None
     if args.range:
         match = re.match(r'^(\d+)-(\d+)$', args.range)
@@ -981,7 +5120,16 @@ def main():
         else:
             print(f"Warning: Invalid range format '{args.range}'. Expecting format 'start-end'.")
 
-    app = Sivvy(args.filename, display_range, args.format, processed_delimiter, manual_delimiter_set)
+    selected_columns = None
+    if args.columns:
+        selected_columns = [column.strip() for column in args.columns.split(',') if column.strip()]
+
+    if args.export:
+        app = Sivvy(args.filename, display_range, args.format, processed_delimiter, manual_delimiter_set, load_file=False, columns=selected_columns, progressive=False)
+        export_formats = [table_format.strip() for table_format in args.export.split(',') if table_format.strip()]
+        sys.exit(app.export_formats(export_formats, args.output_dir, args.export_index))
+
+    app = Sivvy(args.filename, display_range, args.format, processed_delimiter, manual_delimiter_set, compression_level=args.compression_level, columns=selected_columns, schema_filename=args.schema)
     app.run()
 
 
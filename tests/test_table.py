@@ -0,0 +1,157 @@
+import sqlite3
+
+import pytest
+
+from sivvy import Table
+
+
+@pytest.fixture
+def csv_file(tmp_path):
+    path = tmp_path / 'people.csv'
+    path.write_text('id,name,city\n1,Anna,Berlin\n2,Bob,Hamburg\n3,Carl,Köln\n', encoding='utf-8')
+    return path
+
+
+def rows(table):
+    return [list(row) for row in table.iter_rows()]
+
+
+def test_insert_rows(csv_file):
+    table = Table(str(csv_file))
+    assert table.insert_rows(1, [[4, 'Dora', 'Bonn'], ['5', 'Emil']]) == 2
+    assert rows(table)[1:3] == [['4', 'Dora', 'Bonn'], ['5', 'Emil', '']]
+    assert table.insert_rows(None, [['6', 'Frida', 'Kiel']]) == 1
+    assert rows(table)[-1] == ['6', 'Frida', 'Kiel']
+
+
+def test_delete_rows(csv_file):
+    table = Table(str(csv_file))
+    assert table.delete_rows(0) == 1
+    assert [row[0] for row in rows(table)] == ['2', '3']
+    assert table.delete_rows(-1) == 1
+    assert [row[0] for row in rows(table)] == ['2']
+    assert table.delete_rows(5) == 0
+
+
+def test_delete_row_range(csv_file):
+    table = Table(str(csv_file))
+    assert table.delete_rows(1, 3) == 2
+    assert rows(table) == [['1', 'Anna', 'Berlin']]
+
+
+def test_set_cells(csv_file):
+    table = Table(str(csv_file))
+    assert table.set_cells([(0, 'name', 'Anne'), (2, 2, 'Bonn')]) == 2
+    assert table.get_cell(0, 1) == 'Anne'
+    assert table.get_cell(2, 'city') == 'Bonn'
+    with pytest.raises(ValueError):
+        table.set_cells([(0, 'country', 'DE')])
+
+
+def test_column_index(tmp_path):
+    path = tmp_path / 'numbers.csv'
+    path.write_text('id,2,city\n1,a,b\n', encoding='utf-8')
+    table = Table(str(path))
+    assert table.column_index(2) == 2
+    assert table.column_index('2') == 1
+    assert table.column_index('CITY') == 2
+    with pytest.raises(ValueError):
+        table.column_index('3')
+    with pytest.raises(ValueError):
+        table.column_index(3)
+
+
+def test_column_operations(csv_file):
+    table = Table(str(csv_file))
+    table.insert_column('country', 'city', 'DE')
+    table.move_column('city', 0)
+    table.rename_column('name', 'first name')
+    table.drop_column('id')
+    assert table.headers == ['city', 'first name', 'country']
+    assert rows(table)[0] == ['Berlin', 'Anna', 'DE']
+    assert all(len(row) == 3 for row in table.data)
+
+
+def test_split_and_merge_columns(tmp_path):
+    path = tmp_path / 'names.csv'
+    path.write_text('id,full\n1,Anna Maria Schmidt\n2,Bob\n', encoding='utf-8')
+    table = Table(str(path))
+    table.split_column('full', ' ', ['first', 'last'])
+    assert rows(table) == [['1', 'Anna', 'Maria Schmidt'], ['2', 'Bob', '']]
+    table.merge_columns(['last', 'first'], 'name', ', ')
+    assert rows(table) == [['1', 'Maria Schmidt, Anna'], ['2', 'Bob']]
+    # The new columns are computed, the rows keep their cells until they are saved
+    assert all(len(row) == 2 for row in table.data)
+
+    table.undo()
+    table.undo()
+    assert table.headers == ['id', 'full']
+    assert table.stored_width == 2
+    table.save()
+    assert path.read_text(encoding='utf-8') == 'id,full\n1,Anna Maria Schmidt\n2,Bob\n'
+
+
+def test_undo(csv_file):
+    table = Table(str(csv_file))
+    original = rows(table)
+    table.set_cells([(0, 'name', 'Anne')])
+    table.delete_rows(1)
+    table.insert_rows(0, [['0', 'Zoe', 'Ulm']])
+    table.drop_column('city')
+    assert table.undo() is not None
+    assert table.undo() is not None
+    assert table.undo() is not None
+    assert table.undo() is not None
+    assert rows(table) == original
+    assert table.undo() is None
+
+
+def test_query(csv_file):
+    table = Table(str(csv_file))
+    headers, result = table.query('SELECT name FROM data WHERE city = ?', ('Hamburg',))
+    assert headers == ['name']
+    assert result == [('Bob',)]
+
+    table.set_cells([(1, 'city', 'Berlin')])
+    headers, result = table.query('SELECT count(*) FROM data WHERE city = ?', ('Berlin',))
+    assert result == [(2,)]
+
+    assert table.query('CREATE INDEX data_city ON data (city)')[0] is None
+    with pytest.raises(sqlite3.Error):
+        table.query('DELETE FROM data')
+    with pytest.raises(sqlite3.Error):
+        table.query('CREATE TABLE other (a)')
+
+
+def test_save(csv_file):
+    table = Table(str(csv_file))
+    table.set_cells([(0, 'name', 'Anne')])
+    table.drop_column('id')
+    table.save()
+    assert csv_file.read_text(encoding='utf-8') == 'name,city\nAnne,Berlin\nBob,Hamburg\nCarl,Köln\n'
+
+
+def test_projected_save(csv_file):
+    table = Table(str(csv_file), columns=['name'])
+    assert table.headers == ['name']
+    table.set_cells([(1, 'name', 'Bert')])
+    table.save()
+    assert csv_file.read_text(encoding='utf-8') == 'id,name,city\n1,Anna,Berlin\n2,Bert,Hamburg\n3,Carl,Köln\n'
+
+
+def test_append_only_save(tmp_path):
+    path = tmp_path / 'quoted.csv'
+    # A full rewrite would drop the quotes, appending keeps the existing lines as they are
+    path.write_text('id,name\n1,"Anna"\n', encoding='utf-8')
+    table = Table(str(path))
+    table.insert_rows(None, [['2', 'Bob']])
+    table.save()
+    assert path.read_text(encoding='utf-8') == 'id,name\n1,"Anna"\n2,Bob\n'
+
+
+def test_new_file(tmp_path):
+    path = tmp_path / 'new.csv'
+    table = Table(str(path), headers=['id', 'name'])
+    table.insert_rows(None, [['1', 'Anna']])
+    table.save()
+    assert path.read_text(encoding='utf-8') == 'id,name\n1,Anna\n'